@@ -1,7 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from backend_clinico.app.core.paginacion import ParametrosPagina
 from backend_clinico.app.Dtos.ConsultaInput import ConsultaInput, UpdateStatusConsultaInput,UpdateEditStatusConsultaInput
 from backend_clinico.app.models.domain.Consultas import Consultas
 from backend_clinico.app.models.repositories.consulta_repositori import (
@@ -9,8 +11,8 @@ from backend_clinico.app.models.repositories.consulta_repositori import (
     actualizar_consulta,  
     actualizar_edit_status_consulta,
     guardar_consulta,
-    obtener_consultas_hoy,
-    obtener_consultas_medico,
+    obtener_consultas_hoy_async,
+    obtener_consultas_medico_async,
     obtener_consultas_por_paciente,
     obtener_consultas_por_medico,
     obtener_total_consultas_medico,
@@ -18,8 +20,9 @@ from backend_clinico.app.models.repositories.consulta_repositori import (
     get_status_por_id_consulta,
     finalizar_consulta  
 )
-from backend_clinico.app.models.conection.dependency import get_db
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.app.models.conection.dependency import get_async_db, get_db
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_current_claims, get_current_claims_async
 from backend_clinico.security.domain.model.user import User
 
 consulta_router = APIRouter(prefix="/consultas", tags=["Consultas"])
@@ -44,7 +47,7 @@ def registrar_consulta(
 def listar_consultas_paciente(
     dni: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id not in [1, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
@@ -53,12 +56,18 @@ def listar_consultas_paciente(
 @consulta_router.get("/medico/{user_fullname_medic}", summary="Obtener consultas por médico (admin y enfermero)")
 def listar_consultas_medico(
     user_fullname_medic: str,
+    response: Response,
+    status: str = None,
+    anio: int = None,
+    mes: int = None,
+    dia: int = None,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id not in [1, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
-    return obtener_consultas_por_medico(db, user_fullname_medic)
+    return obtener_consultas_por_medico(db, user_fullname_medic, pagina, status, anio, mes, dia).responder(response)
 
 @consulta_router.put("/{id_consulta}", summary="Actualizar consulta por id (admin, enfermero y medico)")
 def actualizar_consulta_id(
@@ -111,12 +120,12 @@ def actualizar_edit_status_endpoint(
 
 
 @consulta_router.get("/hoy", response_model=List[Consultas], summary="Obtener consultas del día de hoy (admin y enfermero)")
-def listar_consultas_hoy(
+async def listar_consultas_hoy(
     paciente: Optional[str] = Query(None, description="Nombre o apellido del paciente"),
     hce: Optional[str] = Query(None, description="HCE del paciente"),
     dni: Optional[str] = Query(None, description="DNI del paciente"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenClaims = Depends(get_current_claims_async)
 ):
     """
     Lista las consultas programadas para el día actual.
@@ -125,17 +134,17 @@ def listar_consultas_hoy(
     if current_user.role_id not in [1, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-    consultas = obtener_consultas_hoy(db, paciente, hce, dni)
+    consultas = await obtener_consultas_hoy_async(db, paciente, hce, dni)
     return consultas
 
 
 @consulta_router.get("/hoy/medico", response_model=List[Consultas], summary="Obtener consultas de hoy para el médico autenticado")
-def listar_consultas_medico(
+async def listar_consultas_medico(
     paciente: Optional[str] = Query(None, description="Nombre o apellido del paciente"),
     hce: Optional[str] = Query(None, description="HCE del paciente"),
     dni: Optional[str] = Query(None, description="DNI del paciente"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenClaims = Depends(get_current_claims_async)
 ):
     """
     Lista las consultas del día actual asociadas al médico autenticado.
@@ -144,7 +153,7 @@ def listar_consultas_medico(
     if current_user.role_id != 2: 
         raise HTTPException(status_code=403, detail="Solo los médicos pueden acceder a este recurso.")
 
-    consultas = obtener_consultas_medico(
+    consultas = await obtener_consultas_medico_async(
         db=db,
         medico_fullname=current_user.full_name,
         paciente=paciente,
@@ -158,7 +167,7 @@ def listar_consultas_medico(
 @consulta_router.get("/total/medico", summary="Cantidad total de consultas para el médico autenticado")
 def total_consultas_medico(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id != 2:
         raise HTTPException(status_code=403, detail="Solo los médicos pueden acceder a este recurso.")
@@ -170,7 +179,7 @@ def total_consultas_medico(
 @consulta_router.get("/total/medico/ultimos7dias", summary="Cantidad de consultas en los últimos 7 días para el médico autenticado")
 def total_consultas_ultimos_7_dias(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id != 2:
         raise HTTPException(status_code=403, detail="Solo los médicos pueden acceder a este recurso.")
@@ -184,7 +193,7 @@ def total_consultas_ultimos_7_dias(
 def status_consulta_por_id(
     id_consulta: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id not in [1, 3,2]:
         raise HTTPException(status_code=403, detail="No autorizado")
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend_clinico.app.models.repositories.diagnostico_repository import consulta_exportar_diagnosticos
+from backend_clinico.app.models.repositories.historialclinico_repository import consulta_exportar_historial
+from backend_clinico.app.services.exportacion_service import FORMATOS_EXPORTACION, exportar_filas
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_claims
+
+exportacion_router = APIRouter(prefix="/exportar", tags=["Exportación"])
+
+PATRON_FORMATO = "^(" + "|".join(FORMATOS_EXPORTACION) + ")$"
+
+
+def verificar_admin(current_user: TokenClaims):
+    if current_user.role_id != 1:
+        raise HTTPException(status_code=403, detail="No autorizado")
+
+
+def _respuesta(consulta, formato: str, nombre: str) -> StreamingResponse:
+    return StreamingResponse(
+        exportar_filas(consulta, formato, origen=f"exportación {nombre}"),
+        media_type=FORMATOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'},
+    )
+
+
+@exportacion_router.get("/diagnosticos", summary="Exportar diagnósticos en NDJSON o CSV (solo admin)")
+def exportar_diagnosticos(
+    formato: str = Query(default="ndjson", pattern=PATRON_FORMATO),
+    desde: date = Query(default=None, description="Fecha de consulta desde (inclusive)"),
+    hasta: date = Query(default=None, description="Fecha de consulta hasta (exclusive)"),
+    medico: str = Query(default=None, description="Nombre completo del médico de la consulta"),
+    current_user: TokenClaims = Depends(get_current_claims)
+):
+    verificar_admin(current_user)
+    return _respuesta(consulta_exportar_diagnosticos(desde, hasta, medico), formato, "diagnosticos")
+
+
+@exportacion_router.get("/historial", summary="Exportar historial clínico en NDJSON o CSV (solo admin)")
+def exportar_historial(
+    formato: str = Query(default="ndjson", pattern=PATRON_FORMATO),
+    desde: datetime = Query(default=None, description="Fecha de registro desde (inclusive)"),
+    hasta: datetime = Query(default=None, description="Fecha de registro hasta (exclusive)"),
+    dni: str = Query(default=None, description="DNI del paciente"),
+    current_user: TokenClaims = Depends(get_current_claims)
+):
+    verificar_admin(current_user)
+    return _respuesta(consulta_exportar_historial(desde, hasta, dni), formato, "historial")
@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from backend_clinico.app.models.conection.dependency import get_db
+from datetime import datetime
 
-from backend_clinico.app.models.repositories.historialclinico_repository import obtener_historial_por_dni
-from backend_clinico.security.domain.model.user import User
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend_clinico.app.core.paginacion import ParametrosPagina
+from backend_clinico.app.models.conection.dependency import get_async_db
+
+from backend_clinico.app.models.repositories.historialclinico_repository import obtener_historial_por_dni_async
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_claims_async
 
 historial_router = APIRouter(prefix="/historial", tags=["Historial Clínico"])
 
 @historial_router.get("/{dni}", summary="Obtener historial clínico completo por DNI (doctor , enfermero y admin)")
-def obtener_historial_clinico(
+async def obtener_historial_clinico(
     dni: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    desde: datetime = None,
+    hasta: datetime = None,
+    pagina: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenClaims = Depends(get_current_claims_async)
 ):
     if current_user.role_id not in [1, 2, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-    historial = obtener_historial_por_dni(db, dni)
-    if not historial:
+    historial = await obtener_historial_por_dni_async(db, dni, pagina, desde, hasta)
+    # Una página vacía después de un cursor es el final del historial, no un 404
+    if not historial.items and not pagina.cursor:
         raise HTTPException(status_code=404, detail="Historial clínico no encontrado")
 
-    return historial
+    return historial.responder(response)
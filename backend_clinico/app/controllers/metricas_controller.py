@@ -0,0 +1,14 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend_clinico.app.core.metricas import metricas
+
+# Sin prefijo /api/v1: es la ruta que esperan los scrapers de Prometheus
+metricas_router = APIRouter(tags=["Monitoreo"])
+
+
+@metricas_router.get("/metrics", response_class=PlainTextResponse, summary="Histogramas de latencia en formato Prometheus")
+def exportar_metricas():
+    if not metricas.habilitado:
+        raise HTTPException(status_code=404, detail="Métricas deshabilitadas")
+    return PlainTextResponse(metricas.exportar_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+
+from backend_clinico.app.models.conection.conection import estadisticas_pool, sesiones_abiertas
+from backend_clinico.app.services.prediccion_service import cache_predicciones, ejecutor, planificador, registro
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_claims
+from backend_clinico.app.models.conection.dependency import get_db
+from backend_clinico.security.application.password_utils import ejecutor_passwords
+from backend_clinico.security.domain.repository.email_outbox_repository import EmailOutboxRepository
+from backend_clinico.security.infrastructure.cache_usuarios import cache_usuarios
+from backend_clinico.security.infrastructure.despachador_correos import despachador_correos
+from backend_clinico.security.infrastructure.registro_accesos import registro_accesos
+
+monitoreo_router = APIRouter(prefix="/monitoreo", tags=["Monitoreo"])
+
+
+def verificar_admin(current_user: TokenClaims):
+    if current_user.role_id != 1:
+        raise HTTPException(status_code=403, detail="No autorizado")
+
+
+@monitoreo_router.get("/normalizador", summary="Estadísticas de la caché del normalizador de texto (solo admin)")
+def estadisticas_normalizador(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    if not registro.cargado("normalizador"):
+        return {"cargado": False}
+    return registro.obtener("normalizador").estadisticas()
+
+
+@monitoreo_router.get("/inferencia", summary="Estadísticas del planificador de micro-lotes y del ejecutor de inferencia (solo admin)")
+def estadisticas_inferencia(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return {**planificador.estadisticas(), "ejecutor": ejecutor.estadisticas()}
+
+
+@monitoreo_router.get("/predicciones", summary="Estadísticas de la caché de resultados de predicción (solo admin)")
+def estadisticas_predicciones(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return cache_predicciones.estadisticas()
+
+
+@monitoreo_router.get("/modelos", summary="Tiempo de carga y memoria de los artefactos de ML (solo admin)")
+def estadisticas_modelos(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return registro.estadisticas()
+
+
+@monitoreo_router.get("/pool", summary="Estado del pool de conexiones a la base de datos (solo admin)")
+def estadisticas_pool_db(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return estadisticas_pool()
+
+
+@monitoreo_router.get("/sesiones", summary="Sesiones de base de datos abiertas y dónde se abrieron (solo admin)")
+def sesiones_db(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return sesiones_abiertas()
+
+
+@monitoreo_router.get("/usuarios", summary="Estadísticas de la caché de usuarios autenticados (solo admin)")
+def estadisticas_usuarios(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return cache_usuarios.estadisticas()
+
+
+@monitoreo_router.get("/passwords", summary="Cola y tiempos del pool de hash de contraseñas (solo admin)")
+def estadisticas_passwords(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return ejecutor_passwords.estadisticas()
+
+
+@monitoreo_router.get("/accesos", summary="Escrituras agrupadas del último acceso de los usuarios (solo admin)")
+def estadisticas_accesos(current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return registro_accesos.estadisticas()
+
+
+@monitoreo_router.get("/correos", summary="Cola de correos salientes y estado del despachador (solo admin)")
+def estadisticas_correos(db: Session = Depends(get_db), current_user: TokenClaims = Depends(get_current_claims)):
+    verificar_admin(current_user)
+    return {**despachador_correos.estadisticas(), "cola": EmailOutboxRepository().contar_por_estado(db)}
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend_clinico.app.Dtos.PacienteInput import PacienteInput
+from backend_clinico.app.core.paginacion import ParametrosPagina
 from backend_clinico.app.models.domain.Paciente import Paciente
-from backend_clinico.app.models.conection.dependency import get_db
+from backend_clinico.app.models.conection.dependency import get_async_db, get_db
 from backend_clinico.app.models.repositories.vitalsign_repository import guardar_vital
 from backend_clinico.app.models.repositories.paciente_repository import (
-    buscar_pacientes,
+    buscar_pacientes_async,
     generar_hce,
     guardar_paciente,
     obtener_pacientes,
@@ -18,7 +22,8 @@ from backend_clinico.app.models.repositories.paciente_repository import (
     eliminar_paciente_por_dni,
 )
 from backend_clinico.security.domain.model.user import User
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_current_claims, get_current_claims_async
 
 paciente_router = APIRouter(prefix="/pacientes", tags=["Pacientes"])
 
@@ -59,33 +64,38 @@ def registrar_paciente(
 
     return {"message": "Paciente registrado correctamente", "paciente": nuevo}
 
-@paciente_router.get("/", summary="Listar todos los pacientes")
+@paciente_router.get("/", summary="Listar pacientes (paginado por HCE)")
 def listar_pacientes(
+    response: Response,
+    genero: str = None,
+    desde: datetime = None,
+    hasta: datetime = None,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
-    return obtener_pacientes(db)
+    return obtener_pacientes(db, pagina, genero, desde, hasta).responder(response)
 
 
 @paciente_router.get("/buscar", summary="Buscar pacientes por nombre, apellido, DNI o HCE")
-def buscar_pacientes_endpoint(
+async def buscar_pacientes_endpoint(
     nombre: str = None,
     apellido: str = None,
     dni: str = None,
     hce: str = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenClaims = Depends(get_current_claims_async)
 ):
     verificar_permisos(current_user)
-    resultados = buscar_pacientes(db, nombre, apellido, dni, hce)
+    resultados = await buscar_pacientes_async(db, nombre, apellido, dni, hce)
     return resultados
 
 @paciente_router.get("/{paciente_hce}", summary="Obtener paciente por HCE")
 def obtener_por_hce(
     paciente_hce: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
     paciente = obtener_paciente_por_id(db, paciente_hce)
@@ -97,7 +107,7 @@ def obtener_por_hce(
 def obtener_por_dni(
     dni: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
     paciente = obtener_paciente_por_dni(db, dni)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 
 from sqlmodel import Session,select
 
@@ -11,11 +13,19 @@ from backend_clinico.app.models.domain.Paciente import Paciente
 from backend_clinico.app.models.domain.VitalSign import VitalSign
 from backend_clinico.app.models.repositories.historialclinico_repository import guardar_en_historial_clinico
 from backend_clinico.app.models.repositories.vitalsign_repository import obtener_ultimo_vitalsign_por_dni
-from backend_clinico.app.services.prediccion_service import predecir_diagnostico
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.metricas import metricas
+from backend_clinico.app.core.paginacion import ParametrosPagina
+from backend_clinico.app.services.prediccion_service import (
+    CAMPOS_PREDICCION,
+    predecir_detalle_async,
+    predecir_detalle_lote_async,
+)
 from backend_clinico.app.models.repositories.consulta_repositori import finalizar_consulta
 from backend_clinico.app.models.repositories.diagnostico_repository import (
     guardar_diagnostico,
     guardar_diagnostico_con_vitalsign,
+    guardar_diagnosticos_lote,
     obtener_diagnosticos,
     obtener_diagnostico_por_id,
     eliminar_diagnostico,
@@ -27,43 +37,104 @@ from backend_clinico.app.models.repositories.diagnostico_repository import (
     
 )
 from backend_clinico.app.models.conection.dependency import get_db
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_current_claims
 from backend_clinico.security.domain.model.user import User
 
 predict_router = APIRouter(prefix="/predict", tags=["Diagnóstico"])
 
 
+histograma_con_dni = metricas.histograma(
+    "predecir_con_dni_etapa_segundos", "Duración de cada etapa de POST /predict/from-dni/{dni}"
+)
+
+
 def verificar_permisos(current_user: User):
     if current_user.role_id not in [1, 2]:
         raise HTTPException(status_code=403, detail="No autorizado")
 
 
+# Las rutas que predicen son async: esperan al ejecutor de inferencia sin ocupar un hilo
+# del threadpool, y el acceso a la base de datos se delega con run_in_threadpool.
+# Con ?detalle=true la respuesta suma el ranking top_k y el grupo/zona; sale de la misma
+# pasada del modelo, así que no cuesta una segunda inferencia.
+
+
+def ampliar_con_detalle(respuesta: dict, detalle: dict, incluir: bool) -> dict:
+    if incluir:
+        respuesta.update(top_k=detalle["top_k"], grupo_zona=detalle["grupo_zona"])
+    return respuesta
+
+
 @predict_router.post("/", summary="Realizar predicción clínica")
-def hacer_prediccion(
+async def hacer_prediccion(
     data: DiagnosticoInput,
+    detalle: bool = Query(False, description="Incluye las clases más probables y el grupo/zona"),
+    top_k: int = Query(3, ge=1, le=10),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    verificar_permisos(current_user)
+    datos = data.dict()
+    prediccion = await predecir_detalle_async({campo: datos[campo] for campo in CAMPOS_PREDICCION}, top_k)
+    resultado = prediccion["diagnostico"]
+    await run_in_threadpool(guardar_diagnostico, db, {**datos, "resultado": resultado})
+    return ampliar_con_detalle({"diagnostico": resultado}, prediccion, detalle)
+
+
+@predict_router.post("/batch", summary="Realizar predicciones clínicas por lote")
+async def hacer_prediccion_lote(
+    data: List[DiagnosticoInput],
+    detalle: bool = Query(False, description="Incluye las clases más probables y el grupo/zona"),
+    top_k: int = Query(3, ge=1, le=10),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     verificar_permisos(current_user)
-    resultado = predecir_diagnostico(**data.dict())
-    guardar_diagnostico(db, {**data.dict(), "resultado": resultado})
-    return {"diagnostico": resultado}
+    if len(data) > settings.prediccion_lote_maximo:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote supera el máximo de {settings.prediccion_lote_maximo} casos"
+        )
 
+    registros = [item.dict() for item in data]
+    predicciones = await predecir_detalle_lote_async(
+        [{campo: registro[campo] for campo in CAMPOS_PREDICCION} for registro in registros],
+        top_k
+    )
+    ids = await run_in_threadpool(
+        guardar_diagnosticos_lote,
+        db,
+        [{**registro, "resultado": prediccion["diagnostico"]} for registro, prediccion in zip(registros, predicciones)]
+    )
+    return {
+        "total": len(ids),
+        "diagnosticos": [
+            ampliar_con_detalle({"id": diag_id, "diagnostico": prediccion["diagnostico"]}, prediccion, detalle)
+            for diag_id, prediccion in zip(ids, predicciones)
+        ]
+    }
 
-@predict_router.get("/", summary="Listar diagnósticos")
+
+@predict_router.get("/", summary="Listar diagnósticos (paginado por ID)")
 def listar_diagnosticos(
+    response: Response,
+    dni: str = None,
+    consulta_id: int = None,
+    resultado: str = None,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
-    return obtener_diagnosticos(db)
+    return obtener_diagnosticos(db, pagina, dni, consulta_id, resultado).responder(response)
 
 
 @predict_router.get("/{diagnostico_id}", summary="Obtener diagnóstico por ID")
 def obtener_por_id(
     diagnostico_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
     diag = obtener_diagnostico_por_id(db, diagnostico_id)
@@ -100,36 +171,42 @@ def actualizar(
     return diag_actualizado
 
 @predict_router.post("/from-dni/{dni}", summary="Realizar predicción clínica usando DNI del paciente")
-def predecir_con_dni(
+async def predecir_con_dni(
     dni: str,
     consulta_id: int,
     data: DiagnosticoSimpleInput,
+    detalle: bool = Query(False, description="Incluye las clases más probables y el grupo/zona"),
+    top_k: int = Query(3, ge=1, le=10),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.role_id not in [1, 2]:
         raise HTTPException(status_code=403, detail="No autorizado")
     
-    consulta = db.get(Consultas, consulta_id)
+    with metricas.span(histograma_con_dni, "consulta"):
+        consulta = await run_in_threadpool(db.get, Consultas, consulta_id)
     if not consulta:
         raise HTTPException(status_code=404, detail="Consulta no encontrada")
 
-    vital = obtener_ultimo_vitalsign_por_dni(db, dni)
+    with metricas.span(histograma_con_dni, "signos_vitales"):
+        vital = await run_in_threadpool(obtener_ultimo_vitalsign_por_dni, db, dni)
 
     if not vital:
         raise HTTPException(status_code=404, detail="No se encontraron signos vitales")
 
-    resultado = predecir_diagnostico(
-        temperatura=vital.temperatura,
-        edad=vital.edad,
-        f_card=vital.f_card,
-        f_resp=vital.f_resp,
-        talla=vital.talla,
-        peso=vital.peso,
-        genero=vital.genero,
-        motivo_consulta=data.motivo_consulta,
-        examenfisico=data.examenfisico
-    )
+    with metricas.span(histograma_con_dni, "prediccion"):
+        prediccion = await predecir_detalle_async({
+            "temperatura": vital.temperatura,
+            "edad": vital.edad,
+            "f_card": vital.f_card,
+            "f_resp": vital.f_resp,
+            "talla": vital.talla,
+            "peso": vital.peso,
+            "genero": vital.genero,
+            "motivo_consulta": data.motivo_consulta,
+            "examenfisico": data.examenfisico
+        }, top_k)
+    resultado = prediccion["diagnostico"]
 
     diagnostico = Diagnostico(
         consulta_id=consulta.id,
@@ -150,15 +227,24 @@ def predecir_con_dni(
         imc=vital.imc
     )
 
-    db.add(diagnostico)
+    def guardar():
+        db.add(diagnostico)
 
-    paciente = db.exec(select(Paciente).where(Paciente.dni == dni)).first()
-    guardar_en_historial_clinico(db, diagnostico, paciente)
-    consulta_actualizada = finalizar_consulta(db, consulta_id)
-    db.commit()
-    db.refresh(diagnostico)
+        with metricas.span(histograma_con_dni, "historial"):
+            paciente = db.exec(select(Paciente).where(Paciente.dni == dni)).first()
+            guardar_en_historial_clinico(db, diagnostico, paciente)
+        with metricas.span(histograma_con_dni, "finalizar_consulta"):
+            consulta_actualizada = finalizar_consulta(db, consulta_id)
+        with metricas.span(histograma_con_dni, "commit"):
+            db.commit()
+            db.refresh(diagnostico)
+        return consulta_actualizada
 
-    return {"diagnostico": resultado, "datos": diagnostico, "consulta": consulta_actualizada}
+    consulta_actualizada = await run_in_threadpool(guardar)
+
+    return ampliar_con_detalle(
+        {"diagnostico": resultado, "datos": diagnostico, "consulta": consulta_actualizada}, prediccion, detalle
+    )
 
 
 
@@ -166,7 +252,7 @@ def predecir_con_dni(
 def obtener_por_dni(
     dni: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
     resultados = obtener_diagnosticos_por_dni(db, dni)
@@ -237,7 +323,7 @@ def eliminar_por_dni(
 def get_ultimo_diagnostico_por_dni(
     dni: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ) -> Diagnostico:
     if current_user.role_id not in [1, 2]:
         raise HTTPException(status_code=403, detail="No autorizado")
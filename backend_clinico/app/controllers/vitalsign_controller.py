@@ -16,7 +16,8 @@ from backend_clinico.app.models.repositories.vitalsign_repository import (
     eliminar_vitalsign,
     eliminar_vitalsigns_por_dni,
 )
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_current_claims
 from backend_clinico.security.domain.model.user import User
 
 vitalsign_router = APIRouter(prefix="/vitalsign", tags=["Signos Vitales"])
@@ -111,7 +112,7 @@ def registrar_vitalsign(
         }
 
 @vitalsign_router.get("/{id}", summary="Obtener signo vital por ID")
-def obtener_por_id(id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def obtener_por_id(id: int, db: Session = Depends(get_db), current_user: TokenClaims = Depends(get_current_claims)):
     verificar_permisos(current_user)
     vital = obtener_vitalsign_por_id(db, id)
     if not vital:
@@ -119,12 +120,12 @@ def obtener_por_id(id: int, db: Session = Depends(get_db), current_user: User =
     return vital
 
 @vitalsign_router.get("/dni/{dni}", summary="Obtener signos vitales por DNI")
-def obtener_por_dni(dni: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def obtener_por_dni(dni: str, db: Session = Depends(get_db), current_user: TokenClaims = Depends(get_current_claims)):
     verificar_permisos(current_user)
     return obtener_vitalsigns_por_dni(db, dni)
 
 @vitalsign_router.get("/ultimo/{dni}", summary="Obtener último signo vital por DNI")
-def obtener_ultimo(dni: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def obtener_ultimo(dni: str, db: Session = Depends(get_db), current_user: TokenClaims = Depends(get_current_claims)):
     verificar_permisos(current_user)
     return obtener_ultimo_vitalsign_por_dni(db, dni)
 
@@ -154,7 +155,7 @@ def eliminar_por_dni(dni: str, db: Session = Depends(get_db), current_user: User
 def obtener_vitals_por_paciente_hce(
     paciente_hce: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id not in [1,  3]:
         raise HTTPException(status_code=403, detail="No autorizado")
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Caché en memoria acotada con expulsión LRU, segura entre hilos y con contadores de aciertos.
+    Con `ttl_segundos` cada entrada además vence ese tiempo después de guardarse.
+    """
+
+    def __init__(self, capacidad: int, ttl_segundos: float | None = None):
+        self.capacidad = capacidad
+        self.ttl = ttl_segundos
+        self._datos = OrderedDict()
+        self._lock = Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.vencidas = 0
+
+    def obtener(self, clave, defecto=None):
+        with self._lock:
+            entrada = self._datos.get(clave, _AUSENTE)
+            if entrada is _AUSENTE:
+                self.fallos += 1
+                return defecto
+            valor, vence = entrada
+            if vence is not None and vence <= time.monotonic():
+                del self._datos[clave]
+                self.vencidas += 1
+                self.fallos += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        if self.capacidad <= 0:
+            return
+        vence = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._datos[clave] = (valor, vence)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def eliminar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __contains__(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave, _AUSENTE)
+            return entrada is not _AUSENTE and (entrada[1] is None or entrada[1] > time.monotonic())
+
+    def __len__(self):
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "tamano": len(self._datos),
+                "capacidad": self.capacidad,
+                "ttl_segundos": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "vencidas": self.vencidas,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
@@ -4,7 +4,7 @@
 from pydantic import Field, ValidationError
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 # Cargar variables desde el archivo .env (si existe)
 load_dotenv()
 
@@ -13,6 +13,19 @@ class Settings(BaseSettings):
 
     # Configuración de base de datos
     database_url: str = Field(..., env="DATABASE_URL")
+    # URL para las rutas asíncronas; si no se indica se deriva de DATABASE_URL
+    database_url_async: Optional[str] = Field(default=None, env="DATABASE_URL_ASYNC")
+    # Pool de conexiones (se ignora con SQLite). pool_recycle debe ser menor que el
+    # wait_timeout de MySQL para no reutilizar conexiones que el servidor ya cerró
+    db_pool_size: int = Field(default=10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_pool_timeout: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    # Aviso de sesiones abiertas más de db_sesion_max_segundos; la revisión corre cada db_revision_fugas_segundos (0 la apaga)
+    db_sesion_max_segundos: float = Field(default=30.0, env="DB_SESION_MAX_SEGUNDOS")
+    db_revision_fugas_segundos: float = Field(default=60.0, env="DB_REVISION_FUGAS_SEGUNDOS")
+    db_echo: bool = Field(default=False, env="DB_ECHO")
     
 
     # Configuración de usuario administrador inicial
@@ -32,6 +45,74 @@ class Settings(BaseSettings):
     email_host_user: str = Field(..., env="EMAIL_HOST_USER")
     email_host_password: str = Field(..., env="EMAIL_HOST_PASSWORD")
     email_use_tls: bool = Field(..., env="EMAIL_USE_TLS")
+    # Cola de correos: el despachador revisa pendientes cada intervalo (o al ser avisado) y reintenta con espera exponencial
+    correo_despacho_habilitado: bool = Field(default=True, env="CORREO_DESPACHO_HABILITADO")
+    correo_despacho_intervalo_segundos: float = Field(default=10.0, env="CORREO_DESPACHO_INTERVALO_SEGUNDOS")
+    correo_lote: int = Field(default=50, env="CORREO_LOTE")
+    correo_max_intentos: int = Field(default=6, env="CORREO_MAX_INTENTOS")
+    correo_reintento_base_segundos: float = Field(default=30.0, env="CORREO_REINTENTO_BASE_SEGUNDOS")
+    correo_smtp_timeout_segundos: float = Field(default=20.0, env="CORREO_SMTP_TIMEOUT_SEGUNDOS")
+    correo_smtp_inactividad_segundos: float = Field(default=60.0, env="CORREO_SMTP_INACTIVIDAD_SEGUNDOS")
+    # Cuánto dura la reserva de un lote tomado para enviar; al vencer, lo que no salió vuelve a tomarse
+    correo_reserva_segundos: float = Field(default=300.0, env="CORREO_RESERVA_SEGUNDOS")
+
+    # Artefactos de ML
+    modelos_directorio: str = Field(default="backend_clinico/external", env="MODELOS_DIRECTORIO")
+    modelos_precarga: bool = Field(default=True, env="MODELOS_PRECARGA")
+
+    # Normalización de texto clínico
+    embedder_modelo: str = Field(default="distiluse-base-multilingual-cased-v1", env="EMBEDDER_MODELO")
+    embedder_backend: str = Field(default="torch", env="EMBEDDER_BACKEND")  # torch, torch-int8 u onnx
+    embedder_onnx_directorio: str = Field(default="backend_clinico/external/embedder_onnx", env="EMBEDDER_ONNX_DIRECTORIO")
+    normalizador_cache_tamano: int = Field(default=50000, env="NORMALIZADOR_CACHE_TAMANO")
+    normalizador_cache_disco: Optional[str] = Field(default=None, env="NORMALIZADOR_CACHE_DISCO")
+    normalizador_tabla: Optional[str] = Field(
+        default="backend_clinico/external/vectorizers/tabla_normalizacion.json",
+        env="NORMALIZADOR_TABLA"
+    )
+
+    # Predicción por lotes
+    prediccion_lote_maximo: int = Field(default=1000, env="PREDICCION_LOTE_MAXIMO")
+    # Caché de resultados de predicción (0 la desactiva)
+    prediccion_cache_tamano: int = Field(default=10000, env="PREDICCION_CACHE_TAMANO")
+    prediccion_cache_ttl_segundos: float = Field(default=3600.0, env="PREDICCION_CACHE_TTL_SEGUNDOS")
+
+    # Micro-lotes para predicciones concurrentes
+    inferencia_microlotes: bool = Field(default=True, env="INFERENCIA_MICROLOTES")
+    inferencia_max_espera_ms: float = Field(default=5.0, env="INFERENCIA_MAX_ESPERA_MS")
+    inferencia_max_lote: int = Field(default=32, env="INFERENCIA_MAX_LOTE")
+    # Dónde se ejecuta la inferencia: local, hilos o procesos
+    inferencia_ejecutor: str = Field(default="local", env="INFERENCIA_EJECUTOR")
+    inferencia_trabajadores: int = Field(default=2, env="INFERENCIA_TRABAJADORES")
+
+    # Caché de usuarios autenticados por token (0 la desactiva); el TTL acota cuánto tarda un cambio en otro worker
+    usuarios_cache_tamano: int = Field(default=10000, env="USUARIOS_CACHE_TAMANO")
+    usuarios_cache_ttl_segundos: float = Field(default=30.0, env="USUARIOS_CACHE_TTL_SEGUNDOS")
+
+    # Contraseñas: esquema para hashes nuevos (bcrypt o argon2) y costo de bcrypt; los hashes
+    # con otro esquema o costo se rehashean al iniciar sesión
+    password_esquema: str = Field(default="bcrypt", env="PASSWORD_ESQUEMA")
+    password_bcrypt_rondas: int = Field(default=12, env="PASSWORD_BCRYPT_RONDAS")
+    # Hilos dedicados al hash (idealmente uno por núcleo) y trabajos pendientes antes de responder 503 (0 sin límite)
+    password_hilos: int = Field(default=4, env="PASSWORD_HILOS")
+    password_cola_maxima: int = Field(default=256, env="PASSWORD_COLA_MAXIMA")
+
+    # Cada cuántos segundos se vuelcan juntos los últimos accesos de login (0 escribe en cada login)
+    ultimo_acceso_intervalo_segundos: float = Field(default=5.0, env="ULTIMO_ACCESO_INTERVALO_SEGUNDOS")
+
+    # Máximo de solicitudes de cuenta por llamada a la aprobación masiva
+    aprobacion_lote_maximo: int = Field(default=200, env="APROBACION_LOTE_MAXIMO")
+
+    # Filas por página cuando el cliente no pide ?limite= (0 = el máximo) y tope de cualquier página,
+    # pedida o no: los listados siempre se cortan y devuelven el cursor de la siguiente
+    paginacion_limite_defecto: int = Field(default=100, env="PAGINACION_LIMITE_DEFECTO")
+    paginacion_limite_maximo: int = Field(default=500, env="PAGINACION_LIMITE_MAXIMO")
+
+    # Filas que se traen de la BD por bloque al exportar (cursor del lado del servidor)
+    exportacion_bloque_filas: int = Field(default=1000, env="EXPORTACION_BLOQUE_FILAS")
+
+    # Histogramas de latencia por etapa, expuestos en /metrics (apagados no miden nada)
+    metricas_habilitadas: bool = Field(default=False, env="METRICAS_HABILITADAS")
 
     cors_origins: str = Field(
         default="http://localhost:3000,http://127.0.0.1:3000,http://localhost:5173,http://127.0.0.1:5173",
@@ -0,0 +1,111 @@
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from threading import Lock
+
+from backend_clinico.app.core.config import settings
+
+
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Con las métricas apagadas todos los spans devuelven este mismo objeto: no se mide nada
+_SPAN_NULO = nullcontext()
+
+
+class HistogramaLatencia:
+    """Histograma acumulativo al estilo Prometheus, con una serie por combinación de etiquetas."""
+
+    def __init__(self, nombre: str, descripcion: str, etiquetas: tuple = ("etapa",), limites: tuple = LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self.limites = limites
+        self._series = {}
+        self._lock = Lock()
+
+    def observar(self, segundos: float, *valores):
+        indice = bisect_left(self.limites, segundos)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                # [conteo por bucket (+Inf al final), suma, total]
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += segundos
+            serie[2] += 1
+
+    def exportar(self) -> list[str]:
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = [(valores, list(buckets), suma, total) for valores, (buckets, suma, total) in self._series.items()]
+
+        for valores, buckets, suma, total in sorted(series):
+            etiquetas = [f'{clave}="{_escapar(valor)}"' for clave, valor in zip(self.etiquetas, valores)]
+            acumulado = 0
+            for limite, conteo in zip((*self.limites, "+Inf"), buckets):
+                acumulado += conteo
+                con_limite = [*etiquetas, f'le="{limite}"']
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(con_limite)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(etiquetas)} {suma}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(etiquetas)} {total}")
+        return lineas
+
+
+class _Span:
+    __slots__ = ("histograma", "valores", "inicio")
+
+    def __init__(self, histograma: HistogramaLatencia, valores: tuple):
+        self.histograma = histograma
+        self.valores = valores
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histograma.observar(time.perf_counter() - self.inicio, *self.valores)
+        return False
+
+
+class RegistroMetricas:
+    """
+    Histogramas del proceso y su exportación en formato de texto de Prometheus.
+
+    Mientras `habilitado` sea False, `span` devuelve un contexto vacío compartido:
+    instrumentar una etapa cuesta una llamada y una comparación.
+    """
+
+    def __init__(self, habilitado: bool):
+        self.habilitado = habilitado
+        self._histogramas = {}
+        self._lock = Lock()
+
+    def histograma(self, nombre: str, descripcion: str, etiquetas: tuple = ("etapa",)) -> HistogramaLatencia:
+        with self._lock:
+            if nombre not in self._histogramas:
+                self._histogramas[nombre] = HistogramaLatencia(nombre, descripcion, etiquetas)
+            return self._histogramas[nombre]
+
+    def span(self, histograma: HistogramaLatencia, *valores):
+        if not self.habilitado:
+            return _SPAN_NULO
+        return _Span(histograma, valores)
+
+    def exportar_prometheus(self) -> str:
+        lineas = []
+        with self._lock:
+            histogramas = list(self._histogramas.values())
+        for histograma in histogramas:
+            lineas.extend(histograma.exportar())
+        return "\n".join(lineas) + "\n"
+
+
+def _etiquetas(pares: list[str]) -> str:
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metricas = RegistroMetricas(settings.metricas_habilitadas)
@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Date, DateTime, and_, func, or_
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend_clinico.app.core.config import settings
+
+
+ENCABEZADO_CURSOR = "X-Siguiente-Cursor"
+ENCABEZADO_TOTAL = "X-Total-Count"
+
+
+class ParametrosPagina:
+    """
+    Parámetros comunes de los listados, para usar con `Depends()`.
+
+    El tamaño de página se recorta siempre a PAGINACION_LIMITE_MAXIMO; sin `limite` se usa
+    PAGINACION_LIMITE_DEFECTO (o el máximo si es 0). Ningún listado sale sin tope: si quedan
+    filas, la respuesta trae el cursor aunque el cliente no lo haya pedido. El total solo
+    se calcula si se pide, porque cuesta un COUNT sobre todas las filas del filtro.
+    """
+
+    def __init__(
+        self,
+        limite: int | None = Query(default=None, ge=1, description="Filas por página"),
+        cursor: str | None = Query(default=None, description=f"Valor del encabezado {ENCABEZADO_CURSOR} de la página anterior"),
+        incluir_total: bool = Query(default=False, description=f"Devuelve el total de filas en {ENCABEZADO_TOTAL}"),
+    ):
+        if limite is None:
+            limite = settings.paginacion_limite_defecto or settings.paginacion_limite_maximo
+        self.limite = min(limite, settings.paginacion_limite_maximo)
+        self.cursor = cursor
+        self.incluir_total = incluir_total
+
+
+class Pagina:
+    def __init__(self, items: list, siguiente_cursor: str | None, total: int | None):
+        self.items = items
+        self.siguiente_cursor = siguiente_cursor
+        self.total = total
+
+    def responder(self, response: Response) -> list:
+        """Deja el cursor y el total en los encabezados y devuelve las filas: el cuerpo sigue siendo una lista."""
+        if self.siguiente_cursor:
+            response.headers[ENCABEZADO_CURSOR] = self.siguiente_cursor
+        if self.total is not None:
+            response.headers[ENCABEZADO_TOTAL] = str(self.total)
+        return self.items
+
+
+def codificar_cursor(valores: list) -> str:
+    planos = [valor.isoformat() if isinstance(valor, (date, datetime)) else valor for valor in valores]
+    return base64.urlsafe_b64encode(json.dumps(planos, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columnas: tuple) -> list:
+    try:
+        planos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(planos, list) or len(planos) != len(columnas):
+            raise ValueError("cantidad de valores")
+        valores = []
+        for columna, valor in zip(columnas, planos):
+            if not isinstance(valor, (str, int, float)):
+                raise TypeError("valor de cursor")
+            # JSON conserva enteros y textos; las fechas viajan en ISO y se reconstruyen
+            if isinstance(columna.type, DateTime):
+                valor = datetime.fromisoformat(valor)
+            elif isinstance(columna.type, Date):
+                valor = date.fromisoformat(valor)
+            valores.append(valor)
+        return valores
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def _posteriores(columnas: tuple, valores: list, descendente: bool):
+    """Filas que van después del cursor en el orden (c1, c2, ...): c1 > v1 OR (c1 = v1 AND c2 > v2) ..."""
+    condiciones = []
+    for i, columna in enumerate(columnas):
+        comparacion = columna < valores[i] if descendente else columna > valores[i]
+        iguales = [anterior == valor for anterior, valor in zip(columnas[:i], valores[:i])]
+        condiciones.append(and_(*iguales, comparacion))
+    return or_(*condiciones)
+
+
+def _consulta_pagina(consulta, columnas: tuple, parametros: ParametrosPagina, descendente: bool):
+    if parametros.cursor:
+        consulta = consulta.where(_posteriores(columnas, decodificar_cursor(parametros.cursor, columnas), descendente))
+    orden = [columna.desc() if descendente else columna.asc() for columna in columnas]
+    # Una fila de más indica si existe una página siguiente sin tener que contar
+    return consulta.order_by(*orden).limit(parametros.limite + 1)
+
+
+def _consulta_total(consulta):
+    return select(func.count()).select_from(consulta.order_by(None).subquery())
+
+
+def _armar_pagina(filas: list, columnas: tuple, parametros: ParametrosPagina, total: int | None) -> Pagina:
+    siguiente = None
+    if len(filas) > parametros.limite:
+        filas = filas[:parametros.limite]
+        siguiente = codificar_cursor([getattr(filas[-1], columna.key) for columna in columnas])
+    return Pagina(filas, siguiente, total)
+
+
+def paginar(db: Session, consulta, columnas: tuple, parametros: ParametrosPagina, descendente: bool = False) -> Pagina:
+    """
+    Paginación por clave (keyset): `columnas` define el orden y debe identificar cada fila,
+    terminando en la clave primaria. Cada página es un rango sobre el índice, sin OFFSET.
+    `consulta` es un select con los filtros y sin order_by.
+    """
+    filas = db.exec(_consulta_pagina(consulta, columnas, parametros, descendente)).all()
+    total = db.exec(_consulta_total(consulta)).one() if parametros.incluir_total else None
+    return _armar_pagina(list(filas), columnas, parametros, total)
+
+
+async def paginar_async(db: AsyncSession, consulta, columnas: tuple, parametros: ParametrosPagina, descendente: bool = False) -> Pagina:
+    filas = (await db.exec(_consulta_pagina(consulta, columnas, parametros, descendente))).all()
+    total = (await db.exec(_consulta_total(consulta))).one() if parametros.incluir_total else None
+    return _armar_pagina(list(filas), columnas, parametros, total)
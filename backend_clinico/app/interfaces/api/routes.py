@@ -10,6 +10,9 @@ from backend_clinico.app.controllers.consulta_controller import consulta_router
 from backend_clinico.security.interfaces.rest.account_request_controller import router_account
 from backend_clinico.security.interfaces.rest.profile_controller import router_profile
 from backend_clinico.security.interfaces.rest.notification_controller import router_notification
+from backend_clinico.app.controllers.monitoreo_controller import monitoreo_router
+from backend_clinico.app.controllers.metricas_controller import metricas_router
+from backend_clinico.app.controllers.exportacion_controller import exportacion_router
 router = APIRouter()
 router.include_router(predict_router, prefix="/api/v1", tags=["Diagnóstico"])
 router.include_router(router_auth, prefix="/api/v1", tags=["Autenticación"])
@@ -21,4 +24,7 @@ router.include_router(historial_router, prefix="/api/v1", tags=["Historial Clín
 router.include_router(consulta_router,prefix="/api/v1", tags=["Consultas"])
 router.include_router(router_account, prefix="/api/v1", tags=["Solicitudes de cuenta"])
 router.include_router(router_profile, prefix="/api/v1", tags=["Profiles"])
-router.include_router(router_notification, prefix="/api/v1", tags=["Notificaciones"])
\ No newline at end of file
+router.include_router(router_notification, prefix="/api/v1", tags=["Notificaciones"])
+router.include_router(exportacion_router, prefix="/api/v1", tags=["Exportación"])
+router.include_router(monitoreo_router, prefix="/api/v1", tags=["Monitoreo"])
+router.include_router(metricas_router, tags=["Monitoreo"])
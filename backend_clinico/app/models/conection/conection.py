@@ -1,13 +1,164 @@
 
 
+import os
+import sys
+import time
+import weakref
+from threading import Lock
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, create_engine, Session
 from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.metricas import metricas
 
 DATABASE_URL = settings.database_url
 
+histograma_espera_pool = metricas.histograma(
+    "db_pool_espera_segundos", "Tiempo esperando una conexión libre del pool", etiquetas=()
+)
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que registra cuánto se espera para obtener una conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_medicion = Lock()
+        self.obtenciones = 0
+        self.segundos_espera = 0.0
+        self.espera_maxima = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._lock_medicion:
+                self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            if metricas.habilitado:
+                histograma_espera_pool.observar(espera)
+            with self._lock_medicion:
+                self.obtenciones += 1
+                self.segundos_espera += espera
+                self.espera_maxima = max(self.espera_maxima, espera)
+
+
+def _crear_engine():
+    if DATABASE_URL.startswith("sqlite"):
+        # SQLite no usa pool de red: se deja el pool por defecto de SQLAlchemy
+        return create_engine(DATABASE_URL, echo=settings.db_echo)
+    return create_engine(
+        DATABASE_URL,
+        echo=settings.db_echo,
+        poolclass=PoolMedido,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_timeout=settings.db_pool_timeout,
+    )
+
+
+engine = _crear_engine()
+
+
+def estadisticas_pool() -> dict:
+    pool = engine.pool
+    estadisticas = {"clase": type(pool).__name__, "estado": pool.status()}
+    if isinstance(pool, QueuePool):
+        estadisticas.update(
+            tamano=pool.size(),
+            en_uso=pool.checkedout(),
+            libres=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, PoolMedido):
+        with pool._lock_medicion:
+            estadisticas.update(
+                obtenciones=pool.obtenciones,
+                espera_media_ms=round(pool.segundos_espera / pool.obtenciones * 1000, 3) if pool.obtenciones else 0.0,
+                espera_maxima_ms=round(pool.espera_maxima * 1000, 3),
+                timeouts=pool.timeouts,
+            )
+    estadisticas["sesiones_abiertas"] = len(_sesiones_abiertas)
+    return estadisticas
+
+
+class SesionRastreada(Session):
+    """
+    Session que se anota al abrirse y se borra al cerrarse, para detectar sesiones
+    que quedan abiertas (y con una conexión del pool tomada) más de lo esperado.
+    """
+
+    def __init__(self, *args, origen: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._abierta_desde = time.monotonic()
+        self._origen = origen or _origen_llamada()
+        clave = id(self)
+        referencia = weakref.ref(self, lambda _ref: _sesion_recolectada(clave))
+        with _lock_sesiones:
+            _sesiones_abiertas[clave] = (referencia, self._abierta_desde, self._origen)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            with _lock_sesiones:
+                _sesiones_abiertas.pop(id(self), None)
+
+
+_sesiones_abiertas = {}
+_lock_sesiones = Lock()
+_ESTE_ARCHIVO = os.path.abspath(__file__)
+# Raíz del proyecto (contiene main.py y backend_clinico/)
+_RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(_ESTE_ARCHIVO)))))
+
+
+def _origen_llamada() -> str:
+    """Primer archivo:línea del proyecto (fuera de este módulo) en la pila de quien abrió la sesión."""
+    marco = sys._getframe(2)
+    primero = None
+    while marco is not None:
+        archivo = os.path.abspath(marco.f_code.co_filename)
+        if archivo != _ESTE_ARCHIVO:
+            if archivo.startswith(_RAIZ_PROYECTO) and "site-packages" not in archivo:
+                return f"{os.path.relpath(archivo, _RAIZ_PROYECTO)}:{marco.f_lineno}"
+            primero = primero or f"{archivo}:{marco.f_lineno}"
+        marco = marco.f_back
+    return primero or "desconocido"
+
+
+def _sesion_recolectada(clave: int):
+    with _lock_sesiones:
+        datos = _sesiones_abiertas.pop(clave, None)
+    if datos is not None:
+        print(f"Sesión de BD recolectada sin cerrar (abierta en {datos[2]})")
+
+
+def sesiones_abiertas() -> list[dict]:
+    ahora = time.monotonic()
+    with _lock_sesiones:
+        datos = list(_sesiones_abiertas.values())
+    return sorted(
+        ({"origen": origen, "segundos": round(ahora - inicio, 3)} for _ref, inicio, origen in datos),
+        key=lambda sesion: -sesion["segundos"],
+    )
+
 
-engine = create_engine(DATABASE_URL, echo=True)
+def revisar_fugas(max_segundos: float) -> list[dict]:
+    """Avisa por cada sesión abierta hace más de `max_segundos` y las devuelve."""
+    fugas = [sesion for sesion in sesiones_abiertas() if sesion["segundos"] > max_segundos]
+    for sesion in fugas:
+        print(f"Posible fuga de sesión de BD: abierta hace {sesion['segundos']} s en {sesion['origen']}")
+    return fugas
 
 
-def get_session():
-    return Session(engine)
\ No newline at end of file
+def get_session(origen: str | None = None):
+    """Sesión nueva; quien la pide debe cerrarla (usar `with get_session() as db:` o `get_db`)."""
+    return SesionRastreada(engine, origen=origen)
@@ -0,0 +1,50 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend_clinico.app.core.config import settings
+
+# Driver asíncrono equivalente a cada driver síncrono soportado
+DRIVERS_ASYNC = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def url_async(url: str) -> str:
+    """Traduce la DATABASE_URL síncrona a la del driver asíncrono (aiomysql, asyncpg o aiosqlite)."""
+    original = make_url(url)
+    driver = DRIVERS_ASYNC.get(original.drivername, original.drivername)
+    return original.set(drivername=driver).render_as_string(hide_password=False)
+
+
+DATABASE_URL_ASYNC = settings.database_url_async or url_async(settings.database_url)
+
+
+def _crear_engine_async():
+    if DATABASE_URL_ASYNC.startswith("sqlite"):
+        return create_async_engine(DATABASE_URL_ASYNC, echo=settings.db_echo)
+    return create_async_engine(
+        DATABASE_URL_ASYNC,
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_timeout=settings.db_pool_timeout,
+    )
+
+
+async_engine = _crear_engine_async()
+
+# expire_on_commit=False: los objetos se serializan en la respuesta después de cerrar la sesión
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def get_async_session() -> AsyncSession:
+    return AsyncSessionLocal()
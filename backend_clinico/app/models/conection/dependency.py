@@ -1,11 +1,25 @@
 
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlmodel import Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend_clinico.app.models.conection.conection import get_session
+from backend_clinico.app.models.conection.conection_async import get_async_session
 
-def get_db() -> Generator[Session, None, None]:
-    with get_session() as session:
+def get_db(request: Request) -> Generator[Session, None, None]:
+    session = get_session(origen=f"{request.method} {request.url.path}")
+    try:
+        yield session
+    except Exception:
+        # La transacción a medias no debe volver al pool
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session() as session:
         yield session
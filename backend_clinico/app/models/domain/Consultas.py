@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -7,6 +8,8 @@ from sqlmodel import SQLModel, Field
 
 class Consultas(SQLModel, table=True):
     __tablename__ = "consultas"
+    # Rango de fechas de la exportación de diagnósticos (la fecha va en anio/mes/dia separados)
+    __table_args__ = (Index("ix_consultas_fecha", "anio", "mes", "dia"),)
 
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     paciente_hce: Optional[str] = Field(default=None, foreign_key="pacientes.hce")
@@ -14,7 +17,7 @@ class Consultas(SQLModel, table=True):
     paciente_apellido: Optional[str]= None
     dni: Optional[str] = Field(default=None)
     status: Optional[str] = Field(default="En espera", max_length=50)  
-    user_fullname_medic: Optional[str] = Field(default=None)
+    user_fullname_medic: Optional[str] = Field(default=None, index=True)
     anio:Optional[int] = Field(default=None)
     mes:Optional[int] = Field(default=None)
     dia:Optional[int] = Field(default=None)
@@ -1,9 +1,12 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import datetime, timezone
 
 class HistorialClinico(SQLModel, table=True):
     __tablename__ = "historial_clinico"
+    # Cubre el listado por paciente ordenado por fecha (paginación por clave)
+    __table_args__ = (Index("ix_historial_dni_fecha", "paciente_dni", "fecha_registro", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     paciente_dni: str
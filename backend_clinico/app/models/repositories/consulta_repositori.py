@@ -3,8 +3,10 @@ from typing import List, Optional
 import pytz
 from fastapi import HTTPException
 from sqlmodel import Session, and_, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import func
 
+from backend_clinico.app.core.paginacion import Pagina, ParametrosPagina, paginar
 from backend_clinico.app.models.domain.Paciente import Paciente
 from backend_clinico.app.models.domain.Consultas import Consultas
 from backend_clinico.security.domain.model.user import User
@@ -89,8 +91,25 @@ def guardar_consulta(db: Session, dni: str, user_fullname_medic: str, dia: int,
 def obtener_consultas_por_paciente(db: Session, dni: str):
     return db.exec(select(Consultas).where(Consultas.dni == dni)).all()
 
-def obtener_consultas_por_medico(db: Session, user_fullname: str):
-    return db.exec(select(Consultas).where(Consultas.user_fullname_medic == user_fullname)).all()
+def obtener_consultas_por_medico(
+    db: Session,
+    user_fullname: str,
+    pagina: ParametrosPagina,
+    status: str = None,
+    anio: int = None,
+    mes: int = None,
+    dia: int = None,
+) -> Pagina:
+    query = select(Consultas).where(Consultas.user_fullname_medic == user_fullname)
+    if status:
+        query = query.where(Consultas.status == status)
+    if anio is not None:
+        query = query.where(Consultas.anio == anio)
+    if mes is not None:
+        query = query.where(Consultas.mes == mes)
+    if dia is not None:
+        query = query.where(Consultas.dia == dia)
+    return paginar(db, query, (Consultas.id,), pagina)
 
 def obtener_consulta_por_id(db: Session, id: int) -> Consultas | None:
     return db.get(Consultas, id)
@@ -155,19 +174,21 @@ def actualizar_consulta(db: Session, consulta_id: int, nuevos_datos: dict) -> Co
     return consulta
 
 
-def obtener_consultas_hoy(
-    db: Session,
+def _consulta_consultas_hoy(
+    medico_fullname: Optional[str] = None,
     paciente: Optional[str] = None,
     hce: Optional[str] = None,
     dni: Optional[str] = None
-) -> List[Consultas]:
-    """Obtiene las consultas del día actual con filtros opcionales por paciente, HCE o DNI."""
+):
+    """Arma el SELECT de las consultas del día actual; compartido por las versiones síncrona y asíncrona."""
     hoy_peru = obtener_fecha_peru()
     query = select(Consultas).where(
         (Consultas.anio == hoy_peru.year) &
         (Consultas.mes == hoy_peru.month) &
         (Consultas.dia == hoy_peru.day)
     )
+    if medico_fullname is not None:
+        query = query.where(Consultas.user_fullname_medic == medico_fullname)
 
     # Aplicar filtros opcionales
     if paciente:
@@ -181,8 +202,26 @@ def obtener_consultas_hoy(
         query = query.where(Consultas.paciente_hce == hce)
     if dni:
         query = query.where(Consultas.dni == dni)
+    return query
+
+
+def obtener_consultas_hoy(
+    db: Session,
+    paciente: Optional[str] = None,
+    hce: Optional[str] = None,
+    dni: Optional[str] = None
+) -> List[Consultas]:
+    """Obtiene las consultas del día actual con filtros opcionales por paciente, HCE o DNI."""
+    return db.exec(_consulta_consultas_hoy(paciente=paciente, hce=hce, dni=dni)).all()
+
 
-    return db.exec(query).all()
+async def obtener_consultas_hoy_async(
+    db: AsyncSession,
+    paciente: Optional[str] = None,
+    hce: Optional[str] = None,
+    dni: Optional[str] = None
+) -> List[Consultas]:
+    return (await db.exec(_consulta_consultas_hoy(paciente=paciente, hce=hce, dni=dni))).all()
 
 
 def obtener_consultas_medico(
@@ -193,27 +232,17 @@ def obtener_consultas_medico(
     dni: Optional[str] = None
 ) -> List[Consultas]:
     """Obtiene las consultas del día actual solo para un médico específico."""
-    hoy_peru = obtener_fecha_peru()
-    query = select(Consultas).where(
-        (Consultas.anio == hoy_peru.year) &
-        (Consultas.mes == hoy_peru.month) &
-        (Consultas.dia == hoy_peru.day) &
-        (Consultas.user_fullname_medic == medico_fullname)
-    )
+    return db.exec(_consulta_consultas_hoy(medico_fullname, paciente, hce, dni)).all()
 
-    if paciente:
-        query = query.where(
-            or_(
-                Consultas.paciente_nombre.ilike(f"%{paciente}%"),
-                Consultas.paciente_apellido.ilike(f"%{paciente}%")
-            )
-        )
-    if hce:
-        query = query.where(Consultas.paciente_hce == hce)
-    if dni:
-        query = query.where(Consultas.dni == dni)
 
-    return db.exec(query).all()
+async def obtener_consultas_medico_async(
+    db: AsyncSession,
+    medico_fullname: str,
+    paciente: Optional[str] = None,
+    hce: Optional[str] = None,
+    dni: Optional[str] = None
+) -> List[Consultas]:
+    return (await db.exec(_consulta_consultas_hoy(medico_fullname, paciente, hce, dni))).all()
 
 
 def obtener_total_consultas_medico(
@@ -1,6 +1,10 @@
 
 
-from sqlmodel import Session, select
+from datetime import date
+
+from sqlmodel import Session, and_, or_, select
+from backend_clinico.app.core.paginacion import Pagina, ParametrosPagina, paginar
+from backend_clinico.app.models.domain.Consultas import Consultas
 from backend_clinico.app.models.domain.Diagnostico import Diagnostico
 from backend_clinico.app.models.domain.VitalSign import VitalSign
 
@@ -13,8 +17,67 @@ def guardar_diagnostico(db: Session, data: dict) -> Diagnostico:
     db.refresh(nuevo)
     return nuevo
 
-def obtener_diagnosticos(db: Session) -> list[Diagnostico]:
-    return db.exec(select(Diagnostico)).all()
+def guardar_diagnosticos_lote(db: Session, registros: list[dict]) -> list[int]:
+    """Inserta todos los diagnósticos en una sola transacción y devuelve sus IDs."""
+    nuevos = [Diagnostico(**data) for data in registros]
+    db.add_all(nuevos)
+    db.flush()
+    ids = [diag.id for diag in nuevos]
+    db.commit()
+    return ids
+
+def obtener_diagnosticos(
+    db: Session,
+    pagina: ParametrosPagina,
+    dni: str = None,
+    consulta_id: int = None,
+    resultado: str = None,
+) -> Pagina:
+    query = select(Diagnostico)
+    if dni:
+        query = query.where(Diagnostico.dni == dni)
+    if consulta_id is not None:
+        query = query.where(Diagnostico.consulta_id == consulta_id)
+    if resultado:
+        query = query.where(Diagnostico.resultado == resultado)
+    return paginar(db, query, (Diagnostico.id,), pagina)
+
+def _fecha_consulta(fecha: date, desde: bool):
+    """
+    (anio, mes, dia) >= fecha si `desde`, o < fecha, columna por columna: a diferencia de
+    anio*10000+mes*100+dia, así el rango lo resuelve el índice ix_consultas_fecha.
+    """
+    anio, mes, dia = Consultas.anio, Consultas.mes, Consultas.dia
+    if desde:
+        condicion = or_(anio > fecha.year, and_(anio == fecha.year, mes > fecha.month),
+                        and_(anio == fecha.year, mes == fecha.month, dia >= fecha.day))
+        # La cota sobre anio sola deja un rango simple sobre el prefijo del índice
+        return and_(anio >= fecha.year, condicion)
+    condicion = or_(anio < fecha.year, and_(anio == fecha.year, mes < fecha.month),
+                    and_(anio == fecha.year, mes == fecha.month, dia < fecha.day))
+    return and_(anio <= fecha.year, condicion)
+
+
+def consulta_exportar_diagnosticos(desde: date = None, hasta: date = None, medico: str = None):
+    """
+    Diagnósticos con el médico y la fecha de su consulta, como columnas sueltas
+    (sin objetos ORM) para poder recorrerlos por bloques.
+    """
+    query = select(
+        *Diagnostico.__table__.columns,
+        Consultas.user_fullname_medic.label("medico"),
+        Consultas.anio,
+        Consultas.mes,
+        Consultas.dia,
+    ).outerjoin(Consultas, Diagnostico.consulta_id == Consultas.id)
+    # La consulta guarda la fecha en anio/mes/dia separados
+    if desde:
+        query = query.where(_fecha_consulta(desde, desde=True))
+    if hasta:
+        query = query.where(_fecha_consulta(hasta, desde=False))
+    if medico:
+        query = query.where(Consultas.user_fullname_medic == medico)
+    return query.order_by(Diagnostico.id)
 
 def obtener_diagnostico_por_id(db: Session, diagnostico_id: int) -> Diagnostico | None:
     return db.get(Diagnostico, diagnostico_id)
@@ -73,28 +136,23 @@ def actualizar_ultimo_diagnostico_por_dni(db: Session, dni: str, nuevos_datos: d
     ).first()
 
     if diagnostico:
+        from backend_clinico.app.services.prediccion_service import CAMPOS_PREDICCION, predecir_diagnostico
+
+        # Solo se vuelve a predecir si cambió algún dato que usa el modelo
+        cambia_prediccion = any(
+            clave in CAMPOS_PREDICCION and getattr(diagnostico, clave) != valor
+            for clave, valor in nuevos_datos.items()
+        )
+
         # Actualizar los campos enviados
         for clave, valor in nuevos_datos.items():
             setattr(diagnostico, clave, valor)
 
         # Generar nueva predicción con datos actualizados
-        from backend_clinico.app.services.prediccion_service import predecir_diagnostico
-
-        nuevo_resultado = predecir_diagnostico(
-            temperatura=diagnostico.temperatura,
-            edad=diagnostico.edad,
-            f_card=diagnostico.f_card,
-            f_resp=diagnostico.f_resp,
-            talla=diagnostico.talla,
-            peso=diagnostico.peso,
-            genero=diagnostico.genero,
-            motivo_consulta=diagnostico.motivo_consulta,
-            examenfisico=diagnostico.examenfisico
-        )
-
-        diagnostico.resultado = nuevo_resultado
-        
-       
+        if cambia_prediccion:
+            diagnostico.resultado = predecir_diagnostico(
+                **{campo: getattr(diagnostico, campo) for campo in CAMPOS_PREDICCION}
+            )
 
         db.commit()
         db.refresh(diagnostico)
@@ -1,6 +1,11 @@
 from backend_clinico.app.models.domain.Diagnostico import Diagnostico
 from backend_clinico.app.models.domain.HistorialClinico import HistorialClinico
+from datetime import datetime
+
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend_clinico.app.core.paginacion import Pagina, ParametrosPagina, paginar, paginar_async
 
 from backend_clinico.app.models.domain.Paciente import Paciente
 def guardar_en_historial_clinico(db: Session, diagnostico: Diagnostico, paciente: Paciente):
@@ -26,9 +31,38 @@ def guardar_en_historial_clinico(db: Session, diagnostico: Diagnostico, paciente
     db.refresh(entrada)
 
 
-def obtener_historial_por_dni(db: Session, dni: str) -> list[HistorialClinico]:
-    return db.exec(
-        select(HistorialClinico)
-        .where(HistorialClinico.paciente_dni == dni)
-        .order_by(HistorialClinico.fecha_registro.desc())
-    ).all()
+def consulta_exportar_historial(desde: datetime = None, hasta: datetime = None, dni: str = None):
+    """Historial como columnas sueltas (sin objetos ORM) para recorrerlo por bloques."""
+    query = select(*HistorialClinico.__table__.columns)
+    if dni:
+        query = query.where(HistorialClinico.paciente_dni == dni)
+    if desde:
+        query = query.where(HistorialClinico.fecha_registro >= desde)
+    if hasta:
+        query = query.where(HistorialClinico.fecha_registro < hasta)
+    return query.order_by(HistorialClinico.id)
+
+
+# Más recientes primero; el id desempata registros con la misma fecha
+ORDEN_HISTORIAL = (HistorialClinico.fecha_registro, HistorialClinico.id)
+
+
+def _consulta_historial_por_dni(dni: str, desde: datetime = None, hasta: datetime = None):
+    query = select(HistorialClinico).where(HistorialClinico.paciente_dni == dni)
+    if desde:
+        query = query.where(HistorialClinico.fecha_registro >= desde)
+    if hasta:
+        query = query.where(HistorialClinico.fecha_registro < hasta)
+    return query
+
+
+def obtener_historial_por_dni(
+    db: Session, dni: str, pagina: ParametrosPagina, desde: datetime = None, hasta: datetime = None
+) -> Pagina:
+    return paginar(db, _consulta_historial_por_dni(dni, desde, hasta), ORDEN_HISTORIAL, pagina, descendente=True)
+
+
+async def obtener_historial_por_dni_async(
+    db: AsyncSession, dni: str, pagina: ParametrosPagina, desde: datetime = None, hasta: datetime = None
+) -> Pagina:
+    return await paginar_async(db, _consulta_historial_por_dni(dni, desde, hasta), ORDEN_HISTORIAL, pagina, descendente=True)
@@ -2,8 +2,10 @@ import random
 from fastapi import HTTPException
 from sqlmodel import Session
 from sqlmodel import select, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime
 
+from backend_clinico.app.core.paginacion import Pagina, ParametrosPagina, paginar
 
 from backend_clinico.app.models.domain.Paciente import Paciente
 
@@ -29,7 +31,7 @@ def guardar_paciente(db: Session, data: dict) -> Paciente:
     db.refresh(nuevo)
     return nuevo
 
-def buscar_pacientes(db: Session, nombre: str = None, apellido: str = None, dni: str = None, hce: str = None):
+def _consulta_buscar_pacientes(nombre: str = None, apellido: str = None, dni: str = None, hce: str = None):
     query = select(Paciente)
     condiciones = []
     if nombre:
@@ -42,10 +44,29 @@ def buscar_pacientes(db: Session, nombre: str = None, apellido: str = None, dni:
         condiciones.append(Paciente.hce == hce)
     if condiciones:
         query = query.where(or_(*condiciones))
-    return db.exec(query).all()
+    return query
 
-def obtener_pacientes(db: Session) -> list[Paciente]:
-    return db.exec(select(Paciente)).all()
+def buscar_pacientes(db: Session, nombre: str = None, apellido: str = None, dni: str = None, hce: str = None):
+    return db.exec(_consulta_buscar_pacientes(nombre, apellido, dni, hce)).all()
+
+async def buscar_pacientes_async(db: AsyncSession, nombre: str = None, apellido: str = None, dni: str = None, hce: str = None):
+    return (await db.exec(_consulta_buscar_pacientes(nombre, apellido, dni, hce))).all()
+
+def obtener_pacientes(
+    db: Session,
+    pagina: ParametrosPagina,
+    genero: str = None,
+    desde: datetime = None,
+    hasta: datetime = None,
+) -> Pagina:
+    query = select(Paciente)
+    if genero:
+        query = query.where(Paciente.genero == genero)
+    if desde:
+        query = query.where(Paciente.fecha_registro >= desde)
+    if hasta:
+        query = query.where(Paciente.fecha_registro < hasta)
+    return paginar(db, query, (Paciente.hce,), pagina)
 
 
 def obtener_paciente_por_id(db: Session, paciente_hce: str) -> Paciente | None:
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+
+
+EJECUTORES_INFERENCIA = ("local", "hilos", "procesos")
+
+
+class EjecutorInferencia:
+    """
+    Decide dónde corre la predicción de un lote.
+
+    - local: en el mismo hilo que la pide (comportamiento original).
+    - hilos: en un pool de hilos propio, separado del threadpool de FastAPI.
+    - procesos: en procesos dedicados que cargan los modelos al arrancar, de modo que
+      la inferencia no compite por el GIL con los endpoints CRUD del worker.
+
+    `funcion_lote` se usa en local e hilos; en procesos se ejecuta `funcion_remota`,
+    que debe ser una función de módulo (se envía por pickle) e `inicializador` corre
+    una vez en cada proceso.
+    """
+
+    def __init__(self, tipo: str, funcion_lote, funcion_remota=None, inicializador=None, trabajadores: int = 1):
+        if tipo not in EJECUTORES_INFERENCIA:
+            raise ValueError(f"Ejecutor de inferencia no soportado: {tipo}. Opciones: {', '.join(EJECUTORES_INFERENCIA)}")
+        if tipo == "procesos" and funcion_remota is None:
+            raise ValueError("El ejecutor 'procesos' necesita una función de módulo para los trabajadores")
+        self.tipo = tipo
+        self.funcion_lote = funcion_lote
+        self.funcion_remota = funcion_remota
+        self.inicializador = inicializador
+        self.trabajadores = max(1, trabajadores)
+        self._pool = None
+        self._lock = Lock()
+        self.lotes_enviados = 0
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.tipo == "hilos":
+                        self._pool = ThreadPoolExecutor(self.trabajadores, thread_name_prefix="inferencia")
+                    else:
+                        # spawn: un fork del proceso con torch y otros hilos ya iniciados puede bloquearse
+                        self._pool = ProcessPoolExecutor(
+                            self.trabajadores,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=self.inicializador,
+                        )
+        return self._pool
+
+    def iniciar(self):
+        """Arranca el pool por adelantado; en procesos esto dispara la carga de modelos en cada trabajador."""
+        if self.tipo == "procesos":
+            pool = self._obtener_pool()
+            for futuro in [pool.submit(_sin_operacion) for _ in range(self.trabajadores)]:
+                futuro.result()
+        elif self.tipo == "hilos":
+            self._obtener_pool()
+
+    def detener(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def enviar(self, casos: list) -> Future:
+        """Despacha el lote y devuelve un Future con la lista de resultados."""
+        self.lotes_enviados += 1
+        if self.tipo == "local":
+            futuro = Future()
+            try:
+                futuro.set_result(self.funcion_lote(casos))
+            except Exception as error:
+                futuro.set_exception(error)
+            return futuro
+        if self.tipo == "hilos":
+            return self._obtener_pool().submit(self.funcion_lote, casos)
+        return self._obtener_pool().submit(self.funcion_remota, casos)
+
+    def ejecutar(self, casos: list) -> list:
+        return self.enviar(casos).result()
+
+    async def ejecutar_async(self, casos: list) -> list:
+        if self.tipo == "local":
+            # Sin pool propio: se usa el threadpool por defecto para no bloquear el event loop
+            return await asyncio.to_thread(self.funcion_lote, casos)
+        return await asyncio.wrap_future(self.enviar(casos))
+
+    def estadisticas(self) -> dict:
+        return {
+            "tipo": self.tipo,
+            "trabajadores": self.trabajadores if self.tipo != "local" else 0,
+            "iniciado": self._pool is not None,
+            "lotes_enviados": self.lotes_enviados,
+        }
+
+
+def _sin_operacion():
+    return None
@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+
+
+BACKENDS_EMBEDDER = ("torch", "torch-int8", "onnx")
+
+ARCHIVO_METADATOS = "embedder.json"
+ARCHIVO_ONNX = "modelo.onnx"
+ARCHIVO_ONNX_INT8 = "modelo_int8.onnx"
+ARCHIVO_TOKENIZER = "tokenizer.json"
+
+
+class EmbedderOnnx:
+    """
+    Embedder exportado con `backend_clinico.tools.exportar_embedder`.
+
+    Reproduce la tubería de SentenceTransformer (transformer -> mean pooling -> capas
+    densas) con ONNX Runtime y numpy, sin importar torch. Expone el mismo `encode`
+    que usa NormalizadorTexto.
+    """
+
+    def __init__(self, directorio: str):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(directorio, ARCHIVO_METADATOS), encoding="utf-8") as archivo:
+            self.metadatos = json.load(archivo)
+
+        ruta_modelo = os.path.join(directorio, ARCHIVO_ONNX_INT8)
+        if not self.metadatos.get("cuantizado") or not os.path.exists(ruta_modelo):
+            ruta_modelo = os.path.join(directorio, ARCHIVO_ONNX)
+
+        opciones = onnxruntime.SessionOptions()
+        opciones.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.sesion = onnxruntime.InferenceSession(ruta_modelo, opciones, providers=["CPUExecutionProvider"])
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directorio, ARCHIVO_TOKENIZER))
+        self.tokenizer.enable_truncation(self.metadatos["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.metadatos["pad_token_id"], pad_token=self.metadatos["pad_token"])
+
+        self.capas = []
+        for capa in self.metadatos.get("capas_densas", []):
+            pesos = np.load(os.path.join(directorio, capa["archivo"]))
+            self.capas.append((pesos["peso"], pesos["sesgo"], capa["activacion"]))
+
+    def encode(self, textos, batch_size: int = 64, convert_to_numpy: bool = True, **kwargs):
+        unico = isinstance(textos, str)
+        lista = [textos] if unico else list(textos)
+
+        bloques = []
+        for inicio in range(0, len(lista), batch_size):
+            codificados = self.tokenizer.encode_batch(lista[inicio:inicio + batch_size])
+            input_ids = np.array([c.ids for c in codificados], dtype=np.int64)
+            attention_mask = np.array([c.attention_mask for c in codificados], dtype=np.int64)
+
+            estados = self.sesion.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+            # Mean pooling sobre los tokens reales (sin padding)
+            mascara = attention_mask[..., None].astype(np.float32)
+            embeddings = (estados * mascara).sum(axis=1) / np.clip(mascara.sum(axis=1), 1e-9, None)
+
+            for peso, sesgo, activacion in self.capas:
+                embeddings = embeddings @ peso.T + sesgo
+                if activacion == "tanh":
+                    embeddings = np.tanh(embeddings)
+            bloques.append(embeddings.astype(np.float32))
+
+        resultado = np.vstack(bloques) if bloques else np.zeros((0, 0), dtype=np.float32)
+        return resultado[0] if unico else resultado
+
+
+def cargar_embedder(backend: str, modelo: str, directorio_onnx: str | None = None):
+    """Construye el embedder del backend configurado."""
+    if backend not in BACKENDS_EMBEDDER:
+        raise ValueError(f"Backend de embedder no soportado: {backend}. Opciones: {', '.join(BACKENDS_EMBEDDER)}")
+
+    if backend == "onnx":
+        return EmbedderOnnx(directorio_onnx)
+
+    from sentence_transformers import SentenceTransformer
+    embedder = SentenceTransformer(modelo, device="cpu")
+    if backend == "torch-int8":
+        import torch
+        # Cuantización dinámica int8 de las capas lineales: menos memoria y más rápido en CPU
+        embedder = torch.quantization.quantize_dynamic(embedder, {torch.nn.Linear}, dtype=torch.qint8)
+    return embedder
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.models.conection.conection import get_session
+
+
+FORMATOS_EXPORTACION = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _valor_json(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no exportable: {type(valor).__name__}")
+
+
+def _bloque_ndjson(columnas: list[str], filas) -> str:
+    return "".join(
+        json.dumps(dict(zip(columnas, fila)), default=_valor_json, ensure_ascii=False) + "\n"
+        for fila in filas
+    )
+
+
+def _bloque_csv(filas) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(filas)
+    return buffer.getvalue()
+
+
+def exportar_filas(consulta, formato: str, origen: str):
+    """
+    Genera el archivo por bloques de EXPORTACION_BLOQUE_FILAS filas.
+
+    La sesión se abre aquí y no con `get_db`: FastAPI cierra las dependencias antes de
+    recorrer el StreamingResponse. Con `yield_per` el driver usa un cursor del lado del
+    servidor, así que en memoria nunca hay más de un bloque, sin importar el rango.
+    """
+    with get_session(origen=origen) as db:
+        resultado = db.exec(consulta.execution_options(yield_per=settings.exportacion_bloque_filas))
+        columnas = list(resultado.keys())
+        if formato == "csv":
+            yield _bloque_csv([columnas]).encode("utf-8")
+        for filas in resultado.partitions():
+            bloque = _bloque_csv(filas) if formato == "csv" else _bloque_ndjson(columnas, filas)
+            yield bloque.encode("utf-8")
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import re
+import sqlite3
+from threading import Lock
+
+import numpy as np
+import unidecode
+
+from backend_clinico.app.core.cache_lru import CacheLRU
+from backend_clinico.app.core.metricas import metricas
+
+
+UMBRAL_SIMILITUD = 0.75
+
+histograma_embedder = metricas.histograma(
+    "normalizador_embedder_segundos", "Duración de cada llamada al embedder del normalizador", etiquetas=()
+)
+
+# Marca "palabra no consultada" para distinguirla de un mapeo a None (sin canónico)
+_SIN_MAPEO = object()
+
+
+def limpiar_texto(texto):
+    """Pasa a minúsculas, quita tildes, etiquetas HTML y todo lo que no sea letra o espacio."""
+    texto = str(texto).lower()
+    texto = unidecode.unidecode(texto)
+    texto = re.sub(r"<.*?>", " ", texto)
+    texto = re.sub(r"[^a-z\s]", " ", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+class AlmacenMapeos:
+    """
+    Persistencia en SQLite de los mapeos palabra -> canónico, para que sobrevivan a reinicios.
+    Cada fila queda asociada al modelo de embeddings y a la versión del conjunto canónico,
+    así un cambio en cualquiera de los dos no reutiliza mapeos obsoletos.
+    """
+
+    def __init__(self, ruta: str, modelo: str, version: str):
+        self.modelo = modelo
+        self.version = version
+        self._lock = Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS mapeos ("
+                " modelo TEXT NOT NULL, version TEXT NOT NULL, palabra TEXT NOT NULL, canonico TEXT,"
+                " PRIMARY KEY (modelo, version, palabra))"
+            )
+
+    def buscar(self, palabras: list[str]) -> dict:
+        encontrados = {}
+        with self._lock:
+            # SQLite limita la cantidad de parámetros por sentencia
+            for inicio in range(0, len(palabras), 500):
+                grupo = palabras[inicio:inicio + 500]
+                marcadores = ",".join("?" * len(grupo))
+                filas = self._conexion.execute(
+                    f"SELECT palabra, canonico FROM mapeos WHERE modelo = ? AND version = ? AND palabra IN ({marcadores})",
+                    [self.modelo, self.version, *grupo],
+                ).fetchall()
+                encontrados.update(filas)
+        return encontrados
+
+    def guardar(self, mapeos: dict):
+        if not mapeos:
+            return
+        with self._lock, self._conexion:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO mapeos (modelo, version, palabra, canonico) VALUES (?, ?, ?, ?)",
+                [(self.modelo, self.version, palabra, canonico) for palabra, canonico in mapeos.items()],
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT COUNT(*) FROM mapeos WHERE modelo = ? AND version = ?", (self.modelo, self.version)
+            ).fetchone()[0]
+
+
+def clave_modelo(modelo: str, backend: str) -> str:
+    """Identifica los mapeos calculados: el mismo modelo con otro backend (int8, onnx) puede dar otros."""
+    return f"{modelo}:{backend}"
+
+
+def cargar_tabla(ruta: str, modelo: str, version: str) -> dict | None:
+    """
+    Lee la tabla precalculada palabra -> canónico generada por
+    `backend_clinico.tools.construir_tabla_normalizacion`. Devuelve None si no existe
+    o si fue construida para otro modelo, backend o conjunto canónico.
+    `modelo` es la clave de `clave_modelo`.
+    """
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            contenido = json.load(archivo)
+    except FileNotFoundError:
+        return None
+
+    if contenido.get("modelo") != modelo or contenido.get("version") != version:
+        print(f"Tabla de normalización {ruta} ignorada: fue generada para otro modelo/backend o conjunto canónico")
+        return None
+
+    canonicos = contenido["canonicos"]
+    return {palabra: canonicos[i] if i >= 0 else None for palabra, i in contenido["mapeos"].items()}
+
+
+def guardar_tabla(ruta: str, mapeos: dict, canonicos: list[str], modelo: str, version: str):
+    """Escribe la tabla de forma compacta: cada palabra apunta al índice de su canónico (-1 = ninguno)."""
+    indices = {canonico: i for i, canonico in enumerate(canonicos)}
+    contenido = {
+        "modelo": modelo,
+        "version": version,
+        "canonicos": canonicos,
+        "mapeos": {palabra: indices[c] if c is not None else -1 for palabra, c in sorted(mapeos.items())},
+    }
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(contenido, archivo, ensure_ascii=False, separators=(",", ":"))
+
+
+def compilar_sinonimos(sinonimos: dict):
+    """
+    Compila el diccionario {canónico: [variantes]} en una sola expresión regular.
+    Las variantes se limpian igual que el texto de entrada y se ordenan de mayor a
+    menor longitud, así en cada posición gana la coincidencia más larga
+    ("voz ronca" antes que "voz"). Si una variante aparece en varios canónicos se
+    respeta el primero del diccionario.
+    """
+    reemplazos = {}
+    for canonico, variantes in sinonimos.items():
+        for variante in variantes:
+            reemplazos.setdefault(limpiar_texto(variante), canonico)
+    reemplazos.pop("", None)
+
+    if not reemplazos:
+        return None, reemplazos
+    alternativas = sorted(reemplazos, key=lambda v: (-len(v), v))
+    return re.compile("|".join(re.escape(v) for v in alternativas)), reemplazos
+
+
+class NormalizadorTexto:
+    """
+    Motor de normalización clínica: reemplaza sinónimos por su término canónico y
+    aproxima cada palabra restante al canónico más parecido según el embedder.
+
+    Los embeddings de los canónicos se guardan como una única matriz normalizada,
+    de modo que la similitud coseno de todas las palabras de un texto contra todos
+    los canónicos se resuelve con un solo `encode` y un producto matricial.
+
+    El resultado por palabra se guarda en una caché LRU (y opcionalmente en disco),
+    por lo que el vocabulario clínico repetido no vuelve a pasar por el embedder.
+
+    `embedder` puede ser el objeto con `encode` o una función sin argumentos que lo
+    devuelve; en ese caso solo se carga cuando aparece una palabra que no está en la
+    tabla precalculada ni en las cachés.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        sinonimos: dict,
+        umbral: float = UMBRAL_SIMILITUD,
+        modelo_nombre: str = "",
+        cache_tamano: int = 50000,
+        ruta_cache_disco: str | None = None,
+        tabla: dict | None = None,
+    ):
+        if hasattr(embedder, "encode"):
+            self._embedder, self._proveedor_embedder = embedder, None
+        else:
+            self._embedder, self._proveedor_embedder = None, embedder
+        self.sinonimos = sinonimos
+        self.umbral = umbral
+        self.modelo_nombre = modelo_nombre
+        self.canonicos = list(sinonimos.keys())
+        self._canonicos_set = set(self.canonicos)
+        self._patron_sinonimos, self._reemplazos = compilar_sinonimos(sinonimos)
+        self.version = self._calcular_version()
+        self._matriz_canonicos = None
+        self._lock_embedder = Lock()
+
+        self.tabla = tabla or {}
+        self.cache = CacheLRU(cache_tamano)
+        self.almacen = AlmacenMapeos(ruta_cache_disco, modelo_nombre, self.version) if ruta_cache_disco else None
+        self.aciertos_tabla = 0
+        self.aciertos_disco = 0
+        self.palabras_codificadas = 0
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            with self._lock_embedder:
+                if self._embedder is None:
+                    self._embedder = self._proveedor_embedder()
+        return self._embedder
+
+    @property
+    def matriz_canonicos(self) -> np.ndarray:
+        if self._matriz_canonicos is None:
+            self._matriz_canonicos = self._normalizar_filas(self._codificar(self.canonicos))
+        return self._matriz_canonicos
+
+    def _calcular_version(self) -> str:
+        """Huella del conjunto canónico y del umbral: lo único que determina el mapeo de una palabra."""
+        contenido = json.dumps({"canonicos": self.canonicos, "umbral": self.umbral}, sort_keys=True)
+        return hashlib.sha1(contenido.encode("utf-8")).hexdigest()[:12]
+
+    def _codificar(self, textos: list[str]) -> np.ndarray:
+        embedder = self.embedder
+        with metricas.span(histograma_embedder):
+            embeddings = embedder.encode(textos, batch_size=64, convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(textos), -1)
+
+    @staticmethod
+    def _normalizar_filas(matriz: np.ndarray) -> np.ndarray:
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        normas[normas == 0] = 1.0
+        return matriz / normas
+
+    def reemplazar_sinonimos(self, texto: str) -> str:
+        """Reescribe todas las variantes en una sola pasada sobre el texto ya limpio."""
+        if self._patron_sinonimos is None:
+            return texto
+        return self._patron_sinonimos.sub(lambda m: self._reemplazos[m.group(0)], texto)
+
+    def _calcular_mapeos(self, palabras: list[str]) -> dict:
+        """Codifica todas las palabras en una sola llamada al embedder y elige su mejor canónico."""
+        similitudes = self._normalizar_filas(self._codificar(palabras)) @ self.matriz_canonicos.T
+        mejores = similitudes.argmax(axis=1)
+        puntajes = similitudes[np.arange(len(palabras)), mejores]
+        self.palabras_codificadas += len(palabras)
+
+        return {
+            palabra: self.canonicos[indice] if puntaje > self.umbral else None
+            for palabra, indice, puntaje in zip(palabras, mejores, puntajes)
+        }
+
+    def mapear_palabras(self, palabras) -> dict:
+        """
+        Devuelve {palabra: canónico o None} para las palabras no canónicas recibidas.
+        Se consulta primero la tabla precalculada, luego la caché en memoria, luego la
+        de disco y solo lo que falte llega al embedder.
+        """
+        mapa = {}
+        faltantes = []
+        for palabra in {p for p in palabras if p not in self._canonicos_set}:
+            canonico = self.tabla.get(palabra, _SIN_MAPEO)
+            if canonico is not _SIN_MAPEO:
+                self.aciertos_tabla += 1
+                mapa[palabra] = canonico
+                continue
+            canonico = self.cache.obtener(palabra, _SIN_MAPEO)
+            if canonico is _SIN_MAPEO:
+                faltantes.append(palabra)
+            else:
+                mapa[palabra] = canonico
+
+        if faltantes and self.almacen is not None:
+            en_disco = self.almacen.buscar(faltantes)
+            self.aciertos_disco += len(en_disco)
+            for palabra, canonico in en_disco.items():
+                self.cache.guardar(palabra, canonico)
+            mapa.update(en_disco)
+            faltantes = [p for p in faltantes if p not in en_disco]
+
+        if faltantes:
+            nuevos = self._calcular_mapeos(sorted(faltantes))
+            for palabra, canonico in nuevos.items():
+                self.cache.guardar(palabra, canonico)
+            if self.almacen is not None:
+                self.almacen.guardar(nuevos)
+            mapa.update(nuevos)
+
+        return mapa
+
+    def normalizar_lote(self, textos) -> list[str]:
+        """Normaliza varios textos compartiendo un único `encode` para todas sus palabras."""
+        tokenizados = [self.reemplazar_sinonimos(limpiar_texto(texto)).split() for texto in textos]
+        mapa = self.mapear_palabras(p for palabras in tokenizados for p in palabras)
+
+        resultado = []
+        for palabras in tokenizados:
+            resultado.append(" ".join(mapa.get(p) or p for p in palabras))
+        return resultado
+
+    def normalizar(self, texto) -> str:
+        return self.normalizar_lote([texto])[0]
+
+    def estadisticas(self) -> dict:
+        return {
+            "modelo": self.modelo_nombre,
+            "version_canonicos": self.version,
+            "embedder_cargado": self._embedder is not None,
+            "tabla": {"entradas": len(self.tabla), "aciertos": self.aciertos_tabla},
+            "memoria": self.cache.estadisticas(),
+            "disco": {
+                "habilitado": self.almacen is not None,
+                "entradas": len(self.almacen) if self.almacen is not None else 0,
+                "aciertos": self.aciertos_disco,
+            },
+            "palabras_codificadas": self.palabras_codificadas,
+        }
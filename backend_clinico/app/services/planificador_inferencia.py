@@ -0,0 +1,163 @@
+import queue
+import time
+from concurrent.futures import Future, InvalidStateError
+from threading import Lock, Thread
+
+
+_FIN = object()
+
+
+class PlanificadorInferencia:
+    """
+    Agrupa en micro-lotes las predicciones que llegan al mismo tiempo desde distintos hilos.
+
+    Cada llamada deja su caso en una cola y espera un Future. Un hilo de fondo toma el
+    primer caso, junta los que lleguen durante `max_espera_ms` (o hasta `max_lote`) y
+    resuelve todos con una sola llamada a `funcion_lote`, que recibe una lista de casos
+    y devuelve la lista de resultados en el mismo orden.
+
+    Si se indica `enviar_lote` (recibe la lista de casos y devuelve un Future con los
+    resultados), el lote se despacha a ese ejecutor y el hilo vuelve enseguida a juntar
+    el siguiente, sin esperar a que termine el anterior.
+    """
+
+    def __init__(self, funcion_lote, max_espera_ms: float = 5.0, max_lote: int = 32, enviar_lote=None):
+        self.funcion_lote = funcion_lote
+        self.enviar_lote = enviar_lote
+        self.max_espera = max_espera_ms / 1000.0
+        self.max_lote = max(1, max_lote)
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._lock = Lock()
+        self.lotes_ejecutados = 0
+        self.casos_procesados = 0
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = Thread(target=self._bucle, name="planificador-inferencia", daemon=True)
+                self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(_FIN)
+            hilo.join(timeout)
+
+    def enviar(self, caso) -> Future:
+        self.iniciar()
+        futuro = Future()
+        self._cola.put((caso, futuro))
+        return futuro
+
+    def predecir(self, caso, timeout: float | None = None):
+        return self.enviar(caso).result(timeout)
+
+    def _bucle(self):
+        while True:
+            primero = self._cola.get()
+            if primero is _FIN:
+                return
+
+            lote = [primero]
+            limite = time.monotonic() + self.max_espera
+            detener = False
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if item is _FIN:
+                    detener = True
+                    break
+                lote.append(item)
+
+            # Reclamar cada Future lo pasa a "en ejecución": desde ahí ya no se puede cancelar
+            # (p. ej. si el cliente se desconecta) y los set_result posteriores son seguros
+            lote = [item for item in lote if item[1].set_running_or_notify_cancel()]
+            try:
+                if lote:
+                    self._ejecutar(lote)
+            except Exception as error:
+                # Un lote con problemas no puede terminar el hilo: quedarían colgadas todas las predicciones
+                print(f"Error en el planificador de inferencia: {error}")
+                self._fallar_pendientes(lote, error)
+            if detener:
+                return
+
+    def _ejecutar(self, lote):
+        casos = [caso for caso, _ in lote]
+        if self.enviar_lote is not None:
+            try:
+                futuro_lote = self.enviar_lote(casos)
+            except Exception as error:
+                self._fallo(lote, error)
+                return
+            futuro_lote.add_done_callback(lambda f: self._al_terminar(lote, f))
+            return
+
+        try:
+            resultados = self.funcion_lote(casos)
+        except Exception as error:
+            self._fallo(lote, error)
+            return
+        self._resolver(lote, resultados)
+
+    def _al_terminar(self, lote, futuro_lote):
+        try:
+            error = futuro_lote.exception()
+            if error is not None:
+                self._fallo(lote, error)
+            else:
+                self._resolver(lote, futuro_lote.result())
+        except Exception as error:
+            # Los errores dentro de un callback se pierden: se fallan aquí para no dejar a nadie esperando
+            print(f"Error al resolver un lote de inferencia: {error}")
+            self._fallar_pendientes(lote, error)
+
+    def _fallo(self, lote, error):
+        if len(lote) > 1:
+            # Un caso inválido no debe hacer fallar al resto: se reintenta uno por uno
+            for item in lote:
+                self._ejecutar([item])
+        else:
+            _completar(lote[0][1], error=error)
+
+    def _resolver(self, lote, resultados):
+        self.lotes_ejecutados += 1
+        self.casos_procesados += len(lote)
+        for (_, futuro), resultado in zip(lote, resultados):
+            _completar(futuro, resultado=resultado)
+        # Si funcion_lote devolvió menos resultados que casos, zip deja futuros sin resolver
+        self._fallar_pendientes(lote, RuntimeError("La inferencia no devolvió resultado para este caso"))
+
+    def _fallar_pendientes(self, lote, error):
+        for _, futuro in lote:
+            if not futuro.done():
+                _completar(futuro, error=error)
+
+    def estadisticas(self) -> dict:
+        return {
+            "activo": self._hilo is not None and self._hilo.is_alive(),
+            "max_espera_ms": self.max_espera * 1000.0,
+            "max_lote": self.max_lote,
+            "en_cola": self._cola.qsize(),
+            "lotes_ejecutados": self.lotes_ejecutados,
+            "casos_procesados": self.casos_procesados,
+            "tamano_medio_lote": round(self.casos_procesados / self.lotes_ejecutados, 2) if self.lotes_ejecutados else 0.0,
+        }
+
+
+def _completar(futuro: Future, resultado=None, error=None):
+    try:
+        if error is not None:
+            futuro.set_exception(error)
+        else:
+            futuro.set_result(resultado)
+    except InvalidStateError:
+        # Ya resuelto (o cancelado antes de reclamarlo): no hay nadie a quien avisar
+        pass
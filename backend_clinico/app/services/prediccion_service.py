@@ -1,20 +1,17 @@
+import asyncio
+import hashlib
+
 import numpy as np
-import joblib
-import re
-import unidecode
 from scipy.sparse import hstack
-from sentence_transformers import SentenceTransformer, util
-
-
-modelo = joblib.load("backend_clinico/external/model/modelo_rf_mejorado.pkl")
-label_encoder = joblib.load("backend_clinico/external/vectorizers/label_encoder_mejorado.pkl")
-vectorizer_motivo = joblib.load("backend_clinico/external/vectorizers/vectorizer_motivo_mejorado.pkl")
-vectorizer_examen = joblib.load("backend_clinico/external/vectorizers/vectorizer_examen_mejorado.pkl")
-vectorizer_texto = joblib.load("backend_clinico/external/vectorizers/vectorizer_texto_final.pkl")
-encoder_gz = joblib.load("backend_clinico/external/vectorizers/grupo_zona_encoder.pkl")
-
 
-embedder = SentenceTransformer('distiluse-base-multilingual-cased-v1')
+from backend_clinico.app.core.cache_lru import CacheLRU
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.metricas import metricas
+from backend_clinico.app.services.ejecutor_inferencia import EjecutorInferencia
+from backend_clinico.app.services.embedders import cargar_embedder
+from backend_clinico.app.services.normalizacion_service import NormalizadorTexto, cargar_tabla, clave_modelo, limpiar_texto
+from backend_clinico.app.services.planificador_inferencia import PlanificadorInferencia
+from backend_clinico.app.services.registro_modelos import RegistroModelos, cargar_artefacto
 
 
 sinonimos = {
@@ -73,38 +70,72 @@ sinonimos = {
     }
 
 canonicos = list(sinonimos.keys())
-canonico_embeddings = {term: embedder.encode(term) for term in canonicos}
 
-def normalizar_texto(texto):
-    texto = str(texto).lower()
-    texto = unidecode.unidecode(texto)  
-    texto = re.sub(r"<.*?>", " ", texto)  
-    texto = re.sub(r"[^a-z\s]", " ", texto)  
-    texto = re.sub(r"\s+", " ", texto).strip()
 
-    
-    
+def _cargar_embedder():
+    # Import diferido dentro de cargar_embedder: torch solo se carga si el backend lo usa
+    return cargar_embedder(settings.embedder_backend, settings.embedder_modelo, settings.embedder_onnx_directorio)
+
+
+def _crear_normalizador():
+    # El backend forma parte de la clave de la caché en disco y de la tabla: sus mapeos pueden diferir
+    clave = clave_modelo(settings.embedder_modelo, settings.embedder_backend)
+    normalizador = NormalizadorTexto(
+        # El embedder solo se carga si aparece una palabra que no está en la tabla ni en caché
+        lambda: registro.obtener("embedder"),
+        sinonimos,
+        modelo_nombre=clave,
+        cache_tamano=settings.normalizador_cache_tamano,
+        ruta_cache_disco=settings.normalizador_cache_disco,
+    )
+    if settings.normalizador_tabla:
+        normalizador.tabla = cargar_tabla(settings.normalizador_tabla, clave, normalizador.version) or {}
+    return normalizador
 
-    for canonico, variantes in sinonimos.items():
-        for variante in variantes:
-            if variante in texto:
-                texto = texto.replace(variante, canonico)
 
-    
-    palabras = texto.split()
-    for i, palabra in enumerate(palabras):
-        if palabra in canonicos:
-            continue  
+# Los artefactos se cargan la primera vez que se usan (o en la precarga de main.lifespan)
+registro = RegistroModelos()
 
-        emb_palabra = embedder.encode(palabra)
-        similitudes = [(c, util.cos_sim(emb_palabra, canonico_embeddings[c]).item()) for c in canonicos]
-        mejor_canonico, sim = max(similitudes, key=lambda x: x[1])
 
-        if sim > 0.75:
-            palabras[i] = mejor_canonico
-           
+def _registrar_artefacto(nombre: str, ruta_relativa: str):
+    ruta = f"{settings.modelos_directorio}/{ruta_relativa}"
+    registro.registrar(nombre, lambda: cargar_artefacto(ruta), ruta=ruta)
 
-    return " ".join(palabras)
+
+_registrar_artefacto("modelo", "model/modelo_rf_mejorado.pkl")
+_registrar_artefacto("label_encoder", "vectorizers/label_encoder_mejorado.pkl")
+_registrar_artefacto("vectorizer_motivo", "vectorizers/vectorizer_motivo_mejorado.pkl")
+_registrar_artefacto("vectorizer_examen", "vectorizers/vectorizer_examen_mejorado.pkl")
+_registrar_artefacto("vectorizer_texto", "vectorizers/vectorizer_texto_final.pkl")
+_registrar_artefacto("encoder_gz", "vectorizers/grupo_zona_encoder.pkl")
+registro.registrar("embedder", _cargar_embedder)
+registro.registrar("normalizador", _crear_normalizador, ruta=settings.normalizador_tabla)
+
+
+def normalizar_texto(texto):
+    return registro.obtener("normalizador").normalizar(texto)
+
+
+def precargar_modelos():
+    """
+    Carga todos los artefactos. Si el normalizador tiene tabla precalculada, el embedder
+    (y con él torch) se deja para cuando aparezca una palabra desconocida.
+    """
+    registro.precargar([nombre for nombre in registro.nombres() if nombre != "embedder"])
+    if not registro.obtener("normalizador").tabla:
+        registro.precargar(["embedder"])
+
+
+def vocabulario_referencia() -> list[str]:
+    """Palabras del diccionario de sinónimos y de los vocabularios de los vectorizadores."""
+    palabras = set()
+    for canonico, variantes in sinonimos.items():
+        for termino in [canonico, *variantes]:
+            palabras.update(limpiar_texto(termino).split())
+    for nombre in ("vectorizer_motivo", "vectorizer_examen", "vectorizer_texto"):
+        for termino in registro.obtener(nombre).vocabulary_:
+            palabras.update(limpiar_texto(termino).split())
+    return sorted(palabras)
 
 
 def clasificar_grupo_zona(texto):
@@ -116,19 +147,205 @@ def clasificar_grupo_zona(texto):
         return "laringe"
     return "otro"
 
+CAMPOS_PREDICCION = ("temperatura", "edad", "f_card", "f_resp", "talla", "peso", "genero", "motivo_consulta", "examenfisico")
+
+
+def _vector_numerico(caso: dict) -> list:
+    genero_cod = 0 if caso["genero"].lower() == "m" else 1
+    return [caso["temperatura"], caso["edad"], caso["f_card"], caso["f_resp"], caso["talla"], caso["peso"], genero_cod]
+
+
+# Artefactos de los que depende el resultado; el normalizador se incluye para recargar
+# su tabla si cambia, aunque su efecto ya queda en el texto normalizado de la clave
+ARTEFACTOS_PREDICCION = (
+    "modelo", "label_encoder", "vectorizer_motivo", "vectorizer_examen", "vectorizer_texto", "encoder_gz", "normalizador",
+)
+
+histograma_etapas = metricas.histograma(
+    "prediccion_etapa_segundos", "Duración de cada etapa de la tubería de predicción por lote"
+)
+
+cache_predicciones = CacheLRU(settings.prediccion_cache_tamano, ttl_segundos=settings.prediccion_cache_ttl_segundos)
+
+
+def _clave_prediccion(version: str, vector: list, motivo: str, examen: str) -> str:
+    contenido = "\x1f".join([version, repr([float(v) for v in vector]), motivo, examen])
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def _predecir_normalizados(X_num: np.ndarray, motivos_normalizados: list[str], examenes_normalizados: list[str]) -> list[dict]:
+    """
+    Una sola pasada por el bosque (`predict_proba`) da la etiqueta y el ranking completo.
+    Devuelve por caso {"diagnostico", "probabilidades": [(clase, prob)...] ordenadas, "grupo_zona"}.
+    """
+    n = len(motivos_normalizados)
+    textos_finales = [m + " " + e for m, e in zip(motivos_normalizados, examenes_normalizados)]
+
+    with metricas.span(histograma_etapas, "vectorizer_motivo"):
+        X_motivo = registro.obtener("vectorizer_motivo").transform(motivos_normalizados)
+    with metricas.span(histograma_etapas, "vectorizer_examen"):
+        X_examen = registro.obtener("vectorizer_examen").transform(examenes_normalizados)
+    with metricas.span(histograma_etapas, "vectorizer_texto"):
+        X_texto = registro.obtener("vectorizer_texto").transform(textos_finales).multiply(2.0)
+    with metricas.span(histograma_etapas, "encoder_gz"):
+        grupos_zona = [clasificar_grupo_zona(t) for t in textos_finales]
+        gz_encoded = registro.obtener("encoder_gz").transform(grupos_zona).reshape(n, -1)
+
+    with metricas.span(histograma_etapas, "hstack"):
+        X_final = hstack([X_num, X_motivo, X_examen, X_texto, gz_encoded]).tocsr()
+    modelo = registro.obtener("modelo")
+    with metricas.span(histograma_etapas, "predict_proba"):
+        probabilidades = modelo.predict_proba(X_final)
+
+    with metricas.span(histograma_etapas, "ranking"):
+        # Misma regla que RandomForestClassifier.predict: la clase de mayor probabilidad
+        clases = registro.obtener("label_encoder").inverse_transform(modelo.classes_)
+        orden = np.argsort(-probabilidades, axis=1, kind="stable")
+
+        return [
+            {
+                "diagnostico": str(clases[fila_orden[0]]),
+                "probabilidades": [(str(clases[j]), float(fila[j])) for j in fila_orden],
+                "grupo_zona": grupo_zona,
+            }
+            for fila, fila_orden, grupo_zona in zip(probabilidades, orden, grupos_zona)
+        ]
+
+
+def predecir_detalle_lote(casos: list[dict]) -> list[dict]:
+    """
+    Predice el diagnóstico de varios casos a la vez: una normalización compartida,
+    una transformación por vectorizador y una sola llamada al modelo para todo el lote.
+    Cada caso es un dict con las claves de CAMPOS_PREDICCION; cada resultado es el
+    detalle de `_predecir_normalizados` (no debe modificarse: puede venir de la caché).
+
+    Los resultados se guardan en caché por (versión de los artefactos, signos vitales,
+    textos normalizados); solo los casos sin resultado en caché llegan al modelo.
+    """
+    if not casos:
+        return []
+    n = len(casos)
+
+    # Primero la versión: si algún artefacto cambió en disco se recarga antes de usarlo
+    version = registro.version(ARTEFACTOS_PREDICCION)
+    vectores = [_vector_numerico(caso) for caso in casos]
+    with metricas.span(histograma_etapas, "normalizar"):
+        normalizados = registro.obtener("normalizador").normalizar_lote(
+            [caso["motivo_consulta"] for caso in casos] + [caso["examenfisico"] for caso in casos]
+        )
+    motivos_normalizados = normalizados[:n]
+    examenes_normalizados = normalizados[n:]
+
+    claves = [
+        _clave_prediccion(version, vector, motivo, examen)
+        for vector, motivo, examen in zip(vectores, motivos_normalizados, examenes_normalizados)
+    ]
+    por_clave = {}
+    pendientes = []
+    with metricas.span(histograma_etapas, "cache"):
+        for i, clave in enumerate(claves):
+            if clave in por_clave:
+                continue
+            por_clave[clave] = cache_predicciones.obtener(clave)
+            if por_clave[clave] is None:
+                # Casos repetidos dentro del lote se predicen una sola vez
+                pendientes.append(i)
+
+    if pendientes:
+        nuevos = _predecir_normalizados(
+            np.array([vectores[i] for i in pendientes], dtype=float),
+            [motivos_normalizados[i] for i in pendientes],
+            [examenes_normalizados[i] for i in pendientes],
+        )
+        for i, resultado in zip(pendientes, nuevos):
+            por_clave[claves[i]] = resultado
+            cache_predicciones.guardar(claves[i], resultado)
+    return [por_clave[clave] for clave in claves]
+
+
+def predecir_diagnosticos_lote(casos: list[dict]) -> list[str]:
+    return [detalle["diagnostico"] for detalle in predecir_detalle_lote(casos)]
+
+
+def resumir_detalle(detalle: dict, top_k: int) -> dict:
+    """Formato de respuesta: diagnóstico, las `top_k` clases más probables y el grupo/zona."""
+    return {
+        "diagnostico": detalle["diagnostico"],
+        "top_k": [
+            {"diagnostico": clase, "probabilidad": round(probabilidad, 4)}
+            for clase, probabilidad in detalle["probabilidades"][:top_k]
+        ],
+        "grupo_zona": detalle["grupo_zona"],
+    }
+
+
+# Dónde corre la inferencia: en el hilo que la pide, en un pool de hilos o en procesos
+# dedicados con los modelos precargados (ver EjecutorInferencia)
+ejecutor = EjecutorInferencia(
+    settings.inferencia_ejecutor,
+    predecir_detalle_lote,
+    funcion_remota=predecir_detalle_lote,
+    inicializador=precargar_modelos,
+    trabajadores=settings.inferencia_trabajadores,
+)
+
+planificador = PlanificadorInferencia(
+    predecir_detalle_lote,
+    max_espera_ms=settings.inferencia_max_espera_ms,
+    max_lote=settings.inferencia_max_lote,
+    enviar_lote=ejecutor.enviar if ejecutor.tipo != "local" else None,
+)
+
+
+def iniciar_inferencia():
+    """Deja lista la inferencia al arrancar."""
+    ejecutor.iniciar()
+    if ejecutor.tipo != "procesos":
+        # Con procesos los modelos se cargan en cada trabajador, no en este proceso
+        precargar_modelos()
+
+
+def detener_inferencia():
+    planificador.detener()
+    ejecutor.detener()
+
+
+def _crear_caso(temperatura, edad, f_card, f_resp, talla, peso, genero, motivo_consulta, examenfisico) -> dict:
+    return {
+        "temperatura": temperatura,
+        "edad": edad,
+        "f_card": f_card,
+        "f_resp": f_resp,
+        "talla": talla,
+        "peso": peso,
+        "genero": genero,
+        "motivo_consulta": motivo_consulta,
+        "examenfisico": examenfisico,
+    }
+
+
+def _predecir_detalle(caso: dict) -> dict:
+    # Las llamadas concurrentes se agrupan en un mismo lote para el modelo
+    if settings.inferencia_microlotes:
+        return planificador.predecir(caso)
+    return ejecutor.ejecutar([caso])[0]
+
+
+async def _predecir_detalle_async(caso: dict) -> dict:
+    if settings.inferencia_microlotes:
+        return await asyncio.wrap_future(planificador.enviar(caso))
+    return (await ejecutor.ejecutar_async([caso]))[0]
+
+
 def predecir_diagnostico(temperatura, edad, f_card, f_resp, talla, peso, genero, motivo_consulta, examenfisico):
-    genero_cod = 0 if genero.lower() == "m" else 1
-    X_num = np.array([[temperatura, edad, f_card, f_resp, talla, peso, genero_cod]])
+    caso = _crear_caso(temperatura, edad, f_card, f_resp, talla, peso, genero, motivo_consulta, examenfisico)
+    return _predecir_detalle(caso)["diagnostico"]
+
 
-    motivo_normalizado = normalizar_texto(motivo_consulta)
-    examen_normalizado = normalizar_texto(examenfisico)
-    texto_final = motivo_normalizado + " " + examen_normalizado
+async def predecir_detalle_async(caso: dict, top_k: int = 3) -> dict:
+    """Diagnóstico con las `top_k` clases más probables y el grupo/zona, en la misma pasada del modelo."""
+    return resumir_detalle(await _predecir_detalle_async(caso), top_k)
 
-    X_motivo = vectorizer_motivo.transform([motivo_normalizado])
-    X_examen = vectorizer_examen.transform([examen_normalizado])
-    X_texto = vectorizer_texto.transform([texto_final]).multiply(2.0)
-    gz_encoded = encoder_gz.transform([clasificar_grupo_zona(texto_final)]).reshape(1, -1)
 
-    X_final = hstack([X_num, X_motivo, X_examen, X_texto, gz_encoded])
-    y_pred = modelo.predict(X_final)
-    return label_encoder.inverse_transform(y_pred)[0]
+async def predecir_detalle_lote_async(casos: list[dict], top_k: int = 3) -> list[dict]:
+    return [resumir_detalle(detalle, top_k) for detalle in await ejecutor.ejecutar_async(casos)]
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import time
+from threading import Lock
+
+import joblib
+
+
+def memoria_residente_bytes() -> int:
+    """Memoria residente actual del proceso (RSS). En sistemas sin /proc se usa el pico."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss está en KB en Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+def cargar_artefacto(ruta: str):
+    """
+    Carga un pickle de joblib con mmap_mode="r". Solo quedan mapeados (y compartidos
+    entre workers a través del page cache) los arrays numpy guardados tal cual como
+    atributos, p. ej. `classes_` o `idf_` de los vectorizadores. Los árboles del
+    RandomForest no: `Tree.__setstate__` copia nodes/values a memoria propia, así que
+    cada proceso tiene su copia del bosque.
+    """
+    return joblib.load(ruta, mmap_mode="r")
+
+
+class RegistroModelos:
+    """
+    Registro de artefactos de ML cargados de forma diferida y compartida.
+
+    Cada artefacto se registra con una función que lo construye; se carga la primera
+    vez que se pide (o al precargar) y queda guardado para el resto del proceso.
+    """
+
+    def __init__(self):
+        self._fabricas = {}
+        self._rutas = {}
+        self._instancias = {}
+        self._huellas = {}
+        self._locks = {}
+        self._lock_registro = Lock()
+        self._metricas = {}
+
+    def registrar(self, nombre: str, fabrica, ruta: str | None = None):
+        """`ruta` es el archivo del que sale el artefacto; si cambia en disco se vuelve a cargar."""
+        with self._lock_registro:
+            self._fabricas[nombre] = fabrica
+            self._rutas[nombre] = ruta
+            self._locks[nombre] = Lock()
+
+    def obtener(self, nombre: str):
+        instancia = self._instancias.get(nombre)
+        if instancia is not None:
+            return instancia
+
+        with self._locks[nombre]:
+            # Otro hilo pudo haberlo cargado mientras esperábamos el lock
+            if nombre in self._instancias:
+                return self._instancias[nombre]
+
+            rss_antes = memoria_residente_bytes()
+            inicio = time.perf_counter()
+            huella = self._huella_archivo(nombre)
+            instancia = self._fabricas[nombre]()
+            self._metricas[nombre] = {
+                "segundos_carga": round(time.perf_counter() - inicio, 4),
+                "rss_delta_mb": round((memoria_residente_bytes() - rss_antes) / (1024 * 1024), 2),
+            }
+            self._huellas[nombre] = huella
+            self._instancias[nombre] = instancia
+            return instancia
+
+    def _huella_archivo(self, nombre: str):
+        ruta = self._rutas.get(nombre)
+        if ruta is None:
+            return None
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def version(self, nombres) -> str:
+        """
+        Huella de los archivos de los artefactos indicados (fecha de modificación y tamaño).
+        Si alguno cambió en disco desde que se cargó, se descarta para que el próximo
+        `obtener` lo recargue, y la versión devuelta cambia con él.
+        """
+        huellas = []
+        for nombre in nombres:
+            actual = self._huella_archivo(nombre)
+            if nombre in self._instancias and actual != self._huellas.get(nombre):
+                with self._locks[nombre]:
+                    print(f"Artefacto '{nombre}' modificado en disco, se recargará")
+                    self._instancias.pop(nombre, None)
+            huellas.append(f"{nombre}:{actual}")
+        return hashlib.sha1("|".join(huellas).encode("utf-8")).hexdigest()[:12]
+
+    def nombres(self) -> list[str]:
+        return list(self._fabricas)
+
+    def cargado(self, nombre: str) -> bool:
+        return nombre in self._instancias
+
+    def precargar(self, nombres=None):
+        for nombre in nombres or list(self._fabricas):
+            try:
+                self.obtener(nombre)
+            except Exception as e:
+                print(f"Error al precargar '{nombre}': {e}")
+
+    def estadisticas(self) -> dict:
+        return {
+            "rss_mb": round(memoria_residente_bytes() / (1024 * 1024), 2),
+            "artefactos": {
+                nombre: {"cargado": nombre in self._instancias, **self._metricas.get(nombre, {})}
+                for nombre in self._fabricas
+            },
+        }
@@ -1,7 +1,9 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from typing import List
 
-from backend_clinico.security.application.password_utils import hash_password, verify_password
+from backend_clinico.app.core.paginacion import ParametrosPagina
+from backend_clinico.security.application.password_utils import hash_password_async, verify_and_update_async
 from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.repository.user_repository import UserRepository
 from backend_clinico.security.resource.request.user_request import UserUpdateRequest
@@ -11,8 +13,8 @@ class UserService:
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
 
-    def get_all_users(self, db: Session) -> List[User]:
-        return self.user_repo.get_all(db)
+    def get_all_users(self, db: Session, pagina: ParametrosPagina, role_id: int = None, enabled: bool = None):
+        return self.user_repo.get_all(db, pagina, role_id, enabled)
 
     def get_user_by_id(self, db: Session, user_id: int) -> User:
         user = self.user_repo.get_by_id(db, user_id)
@@ -39,12 +41,14 @@ class UserService:
         user.email = data.email
         return self.user_repo.update(db, user)
 
-    def change_password(self, db: Session, user_id: int, old_pass: str, new_pass: str) -> dict:
-        user = self.user_repo.get_by_id(db, user_id)
+    async def change_password(self, db: Session, user_id: int, old_pass: str, new_pass: str) -> dict:
+        """Verificación y hash en el pool de contraseñas sin ocupar un hilo; las consultas, en el threadpool."""
+        user = await run_in_threadpool(self.user_repo.get_by_id, db, user_id)
         if not user:
             raise ValueError("Usuario no encontrado")
-        if not verify_password(old_pass, user.hashed_password):
+        valida, _nuevo_hash = await verify_and_update_async(old_pass, user.hashed_password)
+        if not valida:
             raise ValueError("Contraseña actual incorrecta")
-        user.hashed_password = hash_password(new_pass)
-        self.user_repo.update(db, user)
+        user.hashed_password = await hash_password_async(new_pass)
+        await run_in_threadpool(self.user_repo.update, db, user)
         return {"message": "Contraseña actualizada correctamente"}
\ No newline at end of file
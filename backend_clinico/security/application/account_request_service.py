@@ -0,0 +1,119 @@
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from backend_clinico.security.application.password_utils import hash_passwords_async
+from backend_clinico.security.domain.model.profile import Profile
+from backend_clinico.security.domain.model.user import User
+from backend_clinico.security.domain.repository.account_request_repository import AccountRequestRepository
+from backend_clinico.security.domain.repository.email_outbox_repository import EmailOutboxRepository
+from backend_clinico.security.domain.repository.profile_repository import ProfileRepository
+from backend_clinico.security.domain.repository.role_repository import RoleRepository
+from backend_clinico.security.domain.repository.user_repository import UserRepository
+from backend_clinico.security.infrastructure.plantillas_correo import plantillas_correo
+
+
+class AccountRequestService:
+    """Aprobación masiva de solicitudes de cuenta: todas las altas válidas en una sola transacción."""
+
+    def __init__(self):
+        self.request_repo = AccountRequestRepository()
+        self.user_repo = UserRepository()
+        self.role_repo = RoleRepository()
+        self.profile_repo = ProfileRepository()
+        self.outbox_repo = EmailOutboxRepository()
+
+    def _validar(self, db: Session, items: list) -> tuple[list[dict], list]:
+        """Resultado por ítem (los inválidos ya con su error) y los ítems válidos con su solicitud y rol."""
+        resultados = [{"request_id": item.request_id, "username": item.username, "ok": False} for item in items]
+        solicitudes = self.request_repo.get_by_ids(db, {item.request_id for item in items})
+        roles = self.role_repo.get_by_names(db, {solicitud.requested_role for solicitud in solicitudes.values()})
+        usernames_tomados = self.user_repo.existing_usernames(db, {item.username for item in items})
+        emails = {solicitud.email for solicitud in solicitudes.values()}
+        emails_tomados = self.user_repo.existing_emails(db, emails) | self.profile_repo.existing_emails(db, emails)
+
+        validos = []
+        vistos_request, vistos_username, vistos_email = set(), set(), set()
+        for resultado, item in zip(resultados, items):
+            solicitud = solicitudes.get(item.request_id)
+            if item.request_id in vistos_request or item.username in vistos_username:
+                resultado["error"] = "Solicitud o usuario repetido en el lote"
+            elif solicitud is None:
+                resultado["error"] = "Solicitud no encontrada"
+            elif solicitud.status not in ("pendiente", "aceptado"):
+                resultado["error"] = f"Solicitud en estado '{solicitud.status}'"
+            elif solicitud.requested_role not in roles:
+                resultado["error"] = "Rol solicitado no existe"
+            elif item.username in usernames_tomados:
+                resultado["error"] = "Nombre de usuario ya registrado"
+            elif solicitud.email in emails_tomados:
+                resultado["error"] = "Correo ya registrado"
+            elif solicitud.email.lower() in vistos_email:
+                # Dos solicitudes con el mismo correo (AccountRequest.email es único, pero MySQL compara
+                # sin distinguir mayúsculas al insertar en User): solo se crea la primera válida
+                resultado["error"] = "Correo repetido en el lote"
+            else:
+                validos.append((resultado, item, solicitud, roles[solicitud.requested_role]))
+                vistos_email.add(solicitud.email.lower())
+            vistos_request.add(item.request_id)
+            vistos_username.add(item.username)
+        return resultados, validos
+
+    async def aprobar_y_crear_usuarios(self, db: Session, items: list) -> list[dict]:
+        """
+        Aprueba las solicitudes y crea usuario, perfil y correo de credenciales para cada una.
+        Los ítems inválidos se informan y se saltean; los válidos se guardan juntos con un único
+        commit. Las contraseñas se hashean en paralelo en el pool de contraseñas sin ocupar un
+        hilo mientras tanto; las consultas van al threadpool.
+        """
+        resultados, validos = await run_in_threadpool(self._validar, db, items)
+        if not validos:
+            return resultados
+
+        hashes = await hash_passwords_async([item.password for _resultado, item, _solicitud, _rol in validos])
+        ids = await run_in_threadpool(self._crear, db, validos, hashes)
+        for (resultado, item, _solicitud, _rol) in validos:
+            resultado.update(ok=True, user_id=ids[item.username])
+        return resultados
+
+    def _crear(self, db: Session, validos: list, hashes: list[str]) -> dict[str, int]:
+        """Escribe usuarios, perfiles, estados y correos con un único commit; devuelve el id por username."""
+        usuarios = [
+            User(
+                username=item.username,
+                email=solicitud.email,
+                full_name=solicitud.full_name,
+                hashed_password=hashed_password,
+                enabled=True,
+                role_id=rol.id,
+                area=solicitud.area,
+            )
+            for (_resultado, item, solicitud, rol), hashed_password in zip(validos, hashes)
+        ]
+        try:
+            # INSERT por lotes (executemany); agregar los objetos a la sesión haría un INSERT por fila
+            db.execute(insert(User), [usuario.model_dump(exclude={"id"}) for usuario in usuarios])
+            ids = self.user_repo.ids_by_username(db, [usuario.username for usuario in usuarios])
+            db.execute(insert(Profile), [
+                Profile(user_id=ids[usuario.username], full_name=usuario.full_name, email=usuario.email, area=usuario.area).model_dump(exclude={"id"})
+                for usuario in usuarios
+            ])
+            for _resultado, _item, solicitud, _rol in validos:
+                solicitud.status = "aceptado"
+            correos = plantillas_correo.renderizar_lote(
+                "credenciales", [{"username": item.username, "password": item.password} for _resultado, item, _solicitud, _rol in validos]
+            )
+            self.outbox_repo.encolar_lote(db, [
+                (solicitud.email, *correo) for (_resultado, _item, solicitud, _rol), correo in zip(validos, correos)
+            ])
+            db.commit()
+        except IntegrityError:
+            # Otro alta concurrente tomó un usuario o correo entre la validación y el commit
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Conflicto con otra alta simultánea; vuelva a enviar el lote",
+            )
+        return ids
@@ -1,6 +1,8 @@
 
 from fastapi import HTTPException, status
+from sqlalchemy import update
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend_clinico.security.domain.model.profile import Profile
 
@@ -9,7 +11,7 @@ from backend_clinico.security.domain.repository.profile_repository import Profil
 from backend_clinico.security.domain.repository.role_repository import RoleRepository
 from backend_clinico.security.domain.repository.user_repository import UserRepository
 from backend_clinico.security.infrastructure.jwt_handler import create_access_token
-from backend_clinico.security.application.password_utils import hash_password, verify_password
+from backend_clinico.security.application.password_utils import verify_and_update_async
 from backend_clinico.security.domain.model.auth_token import TokenResponse
 from backend_clinico.security.resource.request.user_request import UserRegister
 
@@ -19,9 +21,14 @@ class AuthService:
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
    
-    def authenticate_user(self, db: Session, username: str, password: str) -> User:
-        user = self.user_repo.get_by_username(db, username)
-        if not user or not verify_password(password, user.hashed_password):
+    async def authenticate_user_async(self, db: AsyncSession, username: str, password: str) -> User:
+        """
+        El hash corre en el pool de contraseñas sin ocupar un hilo del threadpool. Si el hash
+        guardado usa otro esquema o costo, se reemplaza por uno nuevo con un UPDATE directo.
+        """
+        user = await self.user_repo.get_by_username_async(db, username)
+        valida, nuevo_hash = await verify_and_update_async(password, user.hashed_password) if user else (False, None)
+        if not valida:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciales incorrectas",
@@ -33,6 +40,10 @@ class AuthService:
                 detail="Usuario deshabilitado",
             )
 
+        if nuevo_hash:
+            # Mismo password con otro hash: no cambia token_version, los tokens emitidos siguen valiendo
+            await db.exec(update(User).where(User.id == user.id).values(hashed_password=nuevo_hash))
+            await db.commit()
         return user
 
 
@@ -45,7 +56,8 @@ class AuthService:
         )
     
     @staticmethod
-    def register_user(db: Session, data: UserRegister) -> User:
+    def register_user(db: Session, data: UserRegister, hashed_password: str) -> User:
+        """`hashed_password` llega ya calculado (hash_password_async) para no hashear en el hilo de la request."""
         user_repo = UserRepository()
         role_repo = RoleRepository()
         profile_repo = ProfileRepository()
@@ -63,7 +75,7 @@ class AuthService:
             username=data.username,
             email=data.email,
             full_name=data.full_name,
-            hashed_password=hash_password(data.password),
+            hashed_password=hashed_password,
             enabled=True,
             role_id=role.id
         )
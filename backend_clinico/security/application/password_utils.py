@@ -1,9 +1,148 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.metricas import metricas
+
+
+ESQUEMAS_PASSWORD = ("bcrypt", "argon2")
+
+if settings.password_esquema not in ESQUEMAS_PASSWORD:
+    raise ValueError(f"Esquema de contraseñas no soportado: {settings.password_esquema}. Opciones: {', '.join(ESQUEMAS_PASSWORD)}")
+
+# El esquema configurado va primero (se usa para hashear); el otro solo verifica y queda marcado
+# como obsoleto, así needs_update pide rehashear al cambiar de esquema o de costo
+pwd_context = CryptContext(
+    schemes=[settings.password_esquema, *(esquema for esquema in ESQUEMAS_PASSWORD if esquema != settings.password_esquema)],
+    deprecated="auto",
+    bcrypt__rounds=settings.password_bcrypt_rondas,
+)
+
+histograma_passwords = metricas.histograma(
+    "password_segundos", "Tiempo de hash/verificación de contraseñas y de espera en la cola", etiquetas=("operacion", "etapa")
+)
+
+
+class EjecutorPasswords:
+    """
+    Pool de hilos propio para bcrypt/argon2. Las dos librerías liberan el GIL mientras
+    calculan, así que `hilos` cercano a la cantidad de núcleos aprovecha la CPU sin
+    ocupar el threadpool de FastAPI. Si hay más de `cola_maxima` trabajos pendientes,
+    los nuevos se rechazan con 503 en lugar de hacer esperar a todos.
+    """
+
+    def __init__(self, hilos: int, cola_maxima: int):
+        self.hilos = max(1, hilos)
+        self.cola_maxima = cola_maxima
+        self._pool = ThreadPoolExecutor(self.hilos, thread_name_prefix="passwords")
+        self._lock = Lock()
+        self.pendientes = 0
+        self.en_curso = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self.segundos_espera = 0.0
+        self.segundos_calculo = 0.0
+
+    def _ejecutar(self, operacion: str, encolada: float, funcion, *args):
+        inicio = time.perf_counter()
+        with self._lock:
+            self.pendientes -= 1
+            self.en_curso += 1
+        try:
+            return funcion(*args)
+        finally:
+            fin = time.perf_counter()
+            with self._lock:
+                self.en_curso -= 1
+                self.completadas += 1
+                self.segundos_espera += inicio - encolada
+                self.segundos_calculo += fin - inicio
+            if metricas.habilitado:
+                histograma_passwords.observar(inicio - encolada, operacion, "cola")
+                histograma_passwords.observar(fin - inicio, operacion, "calculo")
+
+    def enviar(self, operacion: str, funcion, *args):
+        with self._lock:
+            if self.cola_maxima > 0 and self.pendientes >= self.cola_maxima:
+                self.rechazadas += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado, intente nuevamente en unos segundos",
+                    headers={"Retry-After": "1"},
+                )
+            self.pendientes += 1
+        futuro = self._pool.submit(self._ejecutar, operacion, time.perf_counter(), funcion, *args)
+        futuro.add_done_callback(self._al_terminar)
+        return futuro
+
+    def _al_terminar(self, futuro):
+        # Un trabajo cancelado antes de empezar (cliente desconectado, lote rechazado) nunca
+        # pasa por _ejecutar: se descuenta aquí para no ocupar la cola para siempre
+        if futuro.cancelled():
+            with self._lock:
+                self.pendientes -= 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "esquema": settings.password_esquema,
+                "bcrypt_rondas": settings.password_bcrypt_rondas,
+                "hilos": self.hilos,
+                "cola_maxima": self.cola_maxima,
+                "en_cola": self.pendientes,
+                "en_curso": self.en_curso,
+                "completadas": self.completadas,
+                "rechazadas": self.rechazadas,
+                "espera_media_ms": round(self.segundos_espera / self.completadas * 1000, 3) if self.completadas else 0.0,
+                "calculo_medio_ms": round(self.segundos_calculo / self.completadas * 1000, 3) if self.completadas else 0.0,
+            }
+
+
+ejecutor_passwords = EjecutorPasswords(settings.password_hilos, settings.password_cola_maxima)
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return ejecutor_passwords.enviar("hash", pwd_context.hash, password).result()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return ejecutor_passwords.enviar("verificar", pwd_context.verify, plain_password, hashed_password).result()
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verifica y, si el hash usa un esquema o costo viejo, devuelve el nuevo hash para guardarlo."""
+    return ejecutor_passwords.enviar("verificar", pwd_context.verify_and_update, plain_password, hashed_password).result()
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hashea varias contraseñas en paralelo en el pool, en tandas del tamaño del pool
+    para usar todos los hilos sin ocupar la cola que necesitan los logins.
+    Si la cola se llena a mitad de camino se cancela lo enviado de la tanda y sale el 503
+    del ejecutor: quien llama todavía no escribió nada.
+    """
+    hashes = []
+    for inicio in range(0, len(passwords), ejecutor_passwords.hilos):
+        futuros = []
+        try:
+            for password in passwords[inicio:inicio + ejecutor_passwords.hilos]:
+                futuros.append(ejecutor_passwords.enviar("hash", pwd_context.hash, password))
+        except HTTPException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+        hashes.extend(await asyncio.gather(*(asyncio.wrap_future(futuro) for futuro in futuros)))
+    return hashes
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(ejecutor_passwords.enviar("hash", pwd_context.hash, password))
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Como verify_and_update, sin ocupar un hilo mientras se espera el cálculo."""
+    return await asyncio.wrap_future(
+        ejecutor_passwords.enviar("verificar", pwd_context.verify_and_update, plain_password, hashed_password)
+    )
@@ -14,3 +14,13 @@ class TokenResponse(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+
+
+class TokenClaims(BaseModel):
+    """Datos del usuario firmados en el token: alcanzan para autorizar sin consultar la BD."""
+    id: int
+    username: str
+    role_id: Optional[int] = None
+    full_name: str = ""
+    enabled: bool = False
+    token_version: int = 0
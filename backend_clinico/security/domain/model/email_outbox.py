@@ -0,0 +1,24 @@
+from typing import Optional
+from sqlalchemy import Column, Text
+from sqlmodel import SQLModel, Field
+from datetime import datetime, timezone
+
+
+def ahora_utc() -> datetime:
+    # Sin zona horaria: MySQL guarda DATETIME sin zona y las comparaciones deben ser homogéneas
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EmailOutbox(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    to_email: str = Field(nullable=False)
+    subject: str = Field(nullable=False)
+    # Pueden llevar credenciales: se vacían apenas el correo sale
+    body_text: str = Field(default="", sa_column=Column(Text, nullable=False))
+    body_html: str = Field(default="", sa_column=Column(Text, nullable=False))
+    status: str = Field(default="pendiente", index=True)  # pendiente, enviando, enviado, fallido
+    intentos: int = Field(default=0)
+    proximo_intento: datetime = Field(default_factory=ahora_utc, index=True)
+    ultimo_error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=ahora_utc)
+    enviado_at: Optional[datetime] = Field(default=None)
@@ -15,6 +15,8 @@ class User(SQLModel, table=True):
     role_id: Optional[int] = Field(default=None, foreign_key="role.id")
     area: Optional[str] = Field(default=None)
     ultimo_accesso: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Se incrementa al cambiar contraseña, rol, nombre o habilitación: invalida los tokens ya emitidos
+    token_version: int = Field(default=0, nullable=False)
 
 
    
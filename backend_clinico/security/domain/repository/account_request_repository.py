@@ -15,6 +15,10 @@ class AccountRequestRepository:
     def get_by_id(self, db: Session, request_id: int) -> Optional[AccountRequest]:
         return db.get(AccountRequest, request_id)
 
+    def get_by_ids(self, db: Session, request_ids) -> dict[int, AccountRequest]:
+        statement = select(AccountRequest).where(AccountRequest.id.in_(list(request_ids)))
+        return {request.id: request for request in db.exec(statement).all()}
+
     def update_status(self, db: Session, request: AccountRequest, status: str) -> AccountRequest:
         request.status = status
         db.add(request)
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+
+from backend_clinico.security.domain.model.email_outbox import EmailOutbox, ahora_utc
+
+
+class EmailOutboxRepository:
+    def encolar(self, db: Session, to_email: str, subject: str, body_text: str, body_html: str) -> EmailOutbox:
+        correo = EmailOutbox(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html)
+        db.add(correo)
+        db.commit()
+        db.refresh(correo)
+        return correo
+
+    def encolar_lote(self, db: Session, correos: list[tuple[str, str, str, str]]):
+        """
+        (destino, asunto, texto, html) por correo, en un solo INSERT por lotes (executemany).
+        Quedan en la transacción de quien llama, sin commit.
+        """
+        filas = [
+            EmailOutbox(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html).model_dump(exclude={"id"})
+            for to_email, subject, body_text, body_html in correos
+        ]
+        if filas:
+            db.execute(insert(EmailOutbox), filas)
+
+    def reservar_pendientes(self, db: Session, limite: int, reserva_segundos: float) -> List[EmailOutbox]:
+        """
+        Toma los correos listos para enviar y los deja "enviando" durante `reserva_segundos`,
+        con commit: el envío SMTP ocurre después, sin bloqueos ni conexión de la BD tomados.
+        Si el proceso muere a mitad del envío, al vencer la reserva otro ciclo los vuelve a
+        tomar. SKIP LOCKED deja que varios workers reserven a la vez sin tomar el mismo
+        (SQLite lo ignora: ahí hay un solo escritor). Devuelve los correos fuera de la sesión.
+        """
+        ahora = ahora_utc()
+        statement = (
+            select(EmailOutbox)
+            .where(EmailOutbox.status.in_(("pendiente", "enviando")), EmailOutbox.proximo_intento <= ahora)
+            .order_by(EmailOutbox.id)
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        correos = db.exec(statement).all()
+        for correo in correos:
+            correo.status = "enviando"
+            correo.proximo_intento = ahora + timedelta(seconds=reserva_segundos)
+            db.add(correo)
+        db.flush()
+        # Fuera de la sesión antes del commit, para que no se expiren y se puedan leer al enviar
+        db.expunge_all()
+        db.commit()
+        return correos
+
+    def marcar_enviado(self, db: Session, correo: EmailOutbox):
+        correo.status = "enviado"
+        correo.enviado_at = ahora_utc()
+        correo.body_text = ""
+        correo.body_html = ""
+        correo.ultimo_error = None
+        db.add(correo)
+
+    def marcar_error(self, db: Session, correo: EmailOutbox, error: str, proximo_intento: datetime | None):
+        """Con `proximo_intento` None se agotaron los reintentos y el correo queda fallido."""
+        correo.intentos += 1
+        correo.ultimo_error = error[:1000]
+        if proximo_intento is None:
+            correo.status = "fallido"
+            correo.body_text = ""
+            correo.body_html = ""
+        else:
+            correo.status = "pendiente"
+            correo.proximo_intento = proximo_intento
+        db.add(correo)
+
+    def contar_por_estado(self, db: Session) -> dict:
+        filas = db.exec(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)).all()
+        return {status: total for status, total in filas}
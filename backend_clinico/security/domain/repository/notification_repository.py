@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from backend_clinico.app.core.paginacion import Pagina, ParametrosPagina, paginar
 from backend_clinico.security.domain.model.notification import Notification
 
 class NotificationRepository:
@@ -9,9 +10,9 @@ class NotificationRepository:
         db.refresh(notif)
         return notif
     
-    def get_all(self, db: Session) -> list[Notification]:
-        statement = select(Notification)
-        return db.execute(statement).scalars().all()
+    def get_all(self, db: Session, pagina: ParametrosPagina) -> Pagina:
+        # Las más recientes primero
+        return paginar(db, select(Notification), (Notification.id,), pagina, descendente=True)
 
     def delete_by_id(self, db: Session, notif_id: int) -> bool:
         notif = db.get(Notification, notif_id)
@@ -13,6 +13,9 @@ class ProfileRepository:
 
    
 
+    def existing_emails(self, db: Session, emails) -> set[str]:
+        return set(db.execute(select(Profile.email).where(Profile.email.in_(list(emails)))).scalars().all())
+
     def get_by_user_id(self, db: Session, user_id: int) -> Profile | None:
         statement = select(Profile).where(Profile.user_id == user_id)
         result = db.execute(statement).scalars().first()
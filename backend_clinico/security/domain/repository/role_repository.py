@@ -9,6 +9,9 @@ class RoleRepository:
     def get_by_name(self, db: Session, name: str) -> Optional[Role]:
         return db.exec(select(Role).where(Role.name == name)).first()
   
+    def get_by_names(self, db: Session, names) -> dict[str, Role]:
+        return {role.name: role for role in db.exec(select(Role).where(Role.name.in_(list(names)))).all()}
+
     def get_all(self, db: Session) -> List[Role]:
         return db.exec(select(Role)).all()
    
@@ -2,41 +2,121 @@ from typing import List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from jose import JWTError
 
 from backend_clinico.security.domain.repository.user_repository import UserRepository
+from backend_clinico.security.infrastructure.cache_usuarios import TOKEN_USUARIO_BORRADO, cache_usuarios, versiones_token
 from backend_clinico.security.infrastructure.jwt_handler import decode_access_token
+from backend_clinico.security.domain.model.auth_token import TokenClaims
 from backend_clinico.security.domain.model.user import User
 
-from backend_clinico.app.models.conection.dependency import get_db
+from backend_clinico.app.models.conection.conection import get_session
+from backend_clinico.app.models.conection.conection_async import get_async_session
+from backend_clinico.app.models.conection.dependency import get_async_db, get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credenciales_invalidas() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _payload_del_token(token: str) -> dict:
     try:
         payload = decode_access_token(token)
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+        if payload.get("sub") is None:
+            raise _credenciales_invalidas()
     except JWTError:
-        raise credentials_exception
+        raise _credenciales_invalidas()
+    return payload
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    user = cache_usuarios.obtener(token)
+    if user is not None:
+        return user
+    payload = _payload_del_token(token)
+    version = cache_usuarios.version(payload["sub"])
+    user = UserRepository().get_by_username(db, payload["sub"])
+    if user is None or payload.get("tv", user.token_version) != user.token_version:
+        raise _credenciales_invalidas()
+    cache_usuarios.guardar(token, user, version, payload.get("exp"))
+    return user
 
-    user = UserRepository().get_by_username(db, username)
-    if user is None:
-        raise credentials_exception
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Igual que get_current_user, para rutas async: la consulta no ocupa un hilo del threadpool."""
+    user = cache_usuarios.obtener(token)
+    if user is not None:
+        return user
+    payload = _payload_del_token(token)
+    version = cache_usuarios.version(payload["sub"])
+    user = await UserRepository().get_by_username_async(db, payload["sub"])
+    if user is None or payload.get("tv", user.token_version) != user.token_version:
+        raise _credenciales_invalidas()
+    cache_usuarios.guardar(token, user, version, payload.get("exp"))
     return user
 
 
+def _claims_del_token(token: str) -> TokenClaims:
+    payload = _payload_del_token(token)
+    if "uid" not in payload:
+        # Token emitido antes de que los claims viajaran en él: hay que volver a iniciar sesión
+        raise _credenciales_invalidas()
+    return TokenClaims(
+        id=payload["uid"],
+        username=payload["sub"],
+        role_id=payload.get("role_id"),
+        full_name=payload.get("full_name", ""),
+        enabled=payload.get("enabled", False),
+        token_version=payload.get("tv", 0),
+    )
+
+
+def _verificar_version(claims: TokenClaims, version: int) -> TokenClaims:
+    if version == TOKEN_USUARIO_BORRADO or version != claims.token_version:
+        raise _credenciales_invalidas()
+    return claims
+
+
+def get_current_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    """
+    Autoriza con los claims firmados del token, sin cargar el usuario. Solo se consulta
+    su token_version (y se guarda en caché), para que cambiar la contraseña, el rol o
+    deshabilitar la cuenta invalide los tokens ya emitidos.
+    """
+    claims = _claims_del_token(token)
+    version = versiones_token.obtener(claims.id)
+    if version is None:
+        with get_session() as db:
+            version = UserRepository().get_token_version(db, claims.id)
+        version = TOKEN_USUARIO_BORRADO if version is None else version
+        versiones_token.guardar(claims.id, version)
+    return _verificar_version(claims, version)
+
+
+async def get_current_claims_async(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    claims = _claims_del_token(token)
+    version = versiones_token.obtener(claims.id)
+    if version is None:
+        async with get_async_session() as db:
+            version = await UserRepository().get_token_version_async(db, claims.id)
+        version = TOKEN_USUARIO_BORRADO if version is None else version
+        versiones_token.guardar(claims.id, version)
+    return _verificar_version(claims, version)
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.enabled:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
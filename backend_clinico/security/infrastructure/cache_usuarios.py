@@ -0,0 +1,62 @@
+import time
+from threading import Lock
+
+from backend_clinico.app.core.cache_lru import CacheLRU
+from backend_clinico.app.core.config import settings
+from backend_clinico.security.domain.model.user import User
+
+
+class CacheUsuarios:
+    """
+    Usuarios autenticados por token, para no consultar la tabla user en cada request.
+
+    Cada entrada guarda una copia desacoplada de la sesión, la versión del usuario al
+    leerla y el `exp` del token. `invalidar(username)` sube la versión del usuario y
+    con eso descarta todas sus entradas (de cualquier token) sin recorrer la caché.
+    La versión se lee antes de consultar la BD, así una lectura que se cruza con una
+    actualización queda guardada con la versión vieja y no se usa.
+
+    La invalidación es por proceso: con varios workers, el TTL acota cuánto tarda
+    en verse un cambio hecho en otro.
+    """
+
+    def __init__(self, capacidad: int, ttl_segundos: float):
+        self.cache = CacheLRU(capacidad, ttl_segundos=ttl_segundos)
+        self._versiones = {}
+        self._lock = Lock()
+        self.invalidaciones = 0
+
+    def version(self, username: str) -> int:
+        return self._versiones.get(username, 0)
+
+    def obtener(self, token: str) -> User | None:
+        entrada = self.cache.obtener(token)
+        if entrada is None:
+            return None
+        usuario, version, vence = entrada
+        if version != self.version(usuario.username) or (vence is not None and vence <= time.time()):
+            self.cache.eliminar(token)
+            return None
+        # Copia por request: lo que haga un endpoint con el usuario no toca la entrada
+        return usuario.model_copy()
+
+    def guardar(self, token: str, usuario: User, version: int, vence: float | None):
+        if self.cache.capacidad <= 0:
+            return
+        copia = User.model_validate(usuario.model_dump())
+        self.cache.guardar(token, (copia, version, vence))
+
+    def invalidar(self, username: str):
+        with self._lock:
+            self._versiones[username] = self._versiones.get(username, 0) + 1
+            self.invalidaciones += 1
+
+    def estadisticas(self) -> dict:
+        return {**self.cache.estadisticas(), "invalidaciones": self.invalidaciones}
+
+
+# token_version vigente por id de usuario; TOKEN_USUARIO_BORRADO marca usuarios que ya no existen
+TOKEN_USUARIO_BORRADO = -1
+versiones_token = CacheLRU(settings.usuarios_cache_tamano, ttl_segundos=settings.usuarios_cache_ttl_segundos)
+
+cache_usuarios = CacheUsuarios(settings.usuarios_cache_tamano, settings.usuarios_cache_ttl_segundos)
@@ -0,0 +1,214 @@
+"""
+Envío de correos en segundo plano desde la tabla EmailOutbox.
+
+Los endpoints solo encolan (una fila) y avisan al despachador; un hilo propio reserva los
+pendientes por lotes en una transacción corta y los manda fuera de ella por una conexión
+SMTP que se reutiliza entre correos y lotes. Cada resultado se guarda con su propio commit,
+así una caída a mitad de lote reenvía como mucho el correo en curso. Los errores temporales
+se reintentan con espera exponencial; los rechazos 5xx y los correos que agotan los
+intentos quedan como "fallido".
+
+Para probarlo en local basta un servidor SMTP de prueba, por ejemplo aiosmtpd:
+    python -m aiosmtpd -n -l localhost:1025
+con EMAIL_HOST=localhost, EMAIL_PORT=1025 y EMAIL_USE_TLS=false (sin AUTH anunciado no se hace login).
+"""
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.models.conection.conection import get_session
+from backend_clinico.security.domain.model.email_outbox import EmailOutbox, ahora_utc
+from backend_clinico.security.domain.repository.email_outbox_repository import EmailOutboxRepository
+
+
+class ConexionSMTP:
+    """Conexión SMTP reutilizable: se abre al primer envío y se cierra tras `inactividad_segundos` sin uso."""
+
+    def __init__(self, host: str, port: int, usuario: str, password: str, usar_tls: bool, timeout: float, inactividad_segundos: float):
+        self.host = host
+        self.port = port
+        self.usuario = usuario
+        self.password = password
+        self.usar_tls = usar_tls
+        self.timeout = timeout
+        self.inactividad = inactividad_segundos
+        self._smtp = None
+        self._ultimo_uso = 0.0
+        self.conexiones = 0
+
+    def _conectar(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.usar_tls:
+            smtp.starttls()
+            smtp.ehlo()
+        if smtp.has_extn("auth"):
+            smtp.login(self.usuario, self.password)
+        self.conexiones += 1
+        return smtp
+
+    def enviar(self, mensaje):
+        if self._smtp is not None and time.monotonic() - self._ultimo_uso > self.inactividad:
+            self.cerrar()
+        for intento in range(2):
+            if self._smtp is None:
+                self._smtp = self._conectar()
+            try:
+                self._smtp.send_message(mensaje)
+                self._ultimo_uso = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                # El servidor cerró la conexión reutilizada: se reabre una vez y se reintenta
+                self._smtp = None
+                if intento:
+                    raise
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # Rechazo de este correo: smtplib ya hizo RSET y la conexión sirve para el siguiente
+                raise
+            except Exception:
+                self.cerrar()
+                raise
+
+    def cerrar_si_inactiva(self):
+        if self._smtp is not None and time.monotonic() - self._ultimo_uso > self.inactividad:
+            self.cerrar()
+
+    def cerrar(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except Exception:
+                pass
+
+
+def construir_mensaje(correo: EmailOutbox, remitente: str) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["From"] = remitente
+    msg["To"] = correo.to_email
+    msg["Subject"] = correo.subject
+    # Texto plano como alternativa de la versión HTML
+    msg.attach(MIMEText(correo.body_text, "plain", "utf-8"))
+    msg.attach(MIMEText(correo.body_html, "html", "utf-8"))
+    return msg
+
+
+def es_permanente(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class DespachadorCorreos:
+    def __init__(self, conexion: ConexionSMTP, remitente: str, intervalo_segundos: float, lote: int,
+                 max_intentos: int, reintento_base_segundos: float, reserva_segundos: float):
+        self.conexion = conexion
+        self.remitente = remitente
+        self.intervalo = intervalo_segundos
+        self.lote = max(1, lote)
+        self.max_intentos = max_intentos
+        self.reintento_base = reintento_base_segundos
+        self.reserva = reserva_segundos
+        self.repo = EmailOutboxRepository()
+        self._evento = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.enviados = 0
+        self.errores = 0
+        self.lotes = 0
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="despachador-correos", daemon=True)
+            self._hilo.start()
+
+    def avisar(self):
+        """Despierta al despachador para que no espere al próximo intervalo."""
+        self._evento.set()
+
+    def detener(self, timeout: float = 10.0):
+        self._detener.set()
+        self._evento.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        self.conexion.cerrar()
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                procesados = self.procesar_lote()
+            except Exception as e:
+                print(f"Error en el despachador de correos: {e}")
+                procesados = 0
+            if procesados >= self.lote:
+                # Lote lleno: probablemente quedan más pendientes
+                continue
+            self._evento.wait(self.intervalo)
+            self._evento.clear()
+            self.conexion.cerrar_si_inactiva()
+
+    def _proximo_intento(self, correo: EmailOutbox, error: Exception):
+        if es_permanente(error) or correo.intentos + 1 >= self.max_intentos:
+            return None
+        espera = min(self.reintento_base * 2 ** correo.intentos, 3600.0)
+        return ahora_utc() + timedelta(seconds=espera)
+
+    def procesar_lote(self) -> int:
+        with get_session(origen="despachador de correos") as db:
+            correos = self.repo.reservar_pendientes(db, self.lote, self.reserva)
+        vence = time.monotonic() + self.reserva
+        for correo in correos:
+            if time.monotonic() >= vence:
+                # Reserva vencida: otro worker puede haberlos tomado; los que quedan se retoman luego
+                break
+            try:
+                self.conexion.enviar(construir_mensaje(correo, self.remitente))
+                error = None
+                self.enviados += 1
+            except Exception as e:
+                error = e
+                self.errores += 1
+                print(f"Error al enviar correo {correo.id} a {correo.to_email}: {e}")
+            with get_session(origen="despachador de correos") as db:
+                if error is None:
+                    self.repo.marcar_enviado(db, correo)
+                else:
+                    self.repo.marcar_error(db, correo, str(error), self._proximo_intento(correo, error))
+                db.commit()
+        if correos:
+            self.lotes += 1
+        return len(correos)
+
+    def estadisticas(self) -> dict:
+        return {
+            "activo": self._hilo is not None,
+            "enviados": self.enviados,
+            "errores": self.errores,
+            "lotes": self.lotes,
+            "conexiones_smtp": self.conexion.conexiones,
+        }
+
+
+despachador_correos = DespachadorCorreos(
+    ConexionSMTP(
+        settings.email_host,
+        settings.email_port,
+        settings.email_host_user,
+        settings.email_host_password,
+        settings.email_use_tls,
+        timeout=settings.correo_smtp_timeout_segundos,
+        inactividad_segundos=settings.correo_smtp_inactividad_segundos,
+    ),
+    remitente=settings.email_host_user,
+    intervalo_segundos=settings.correo_despacho_intervalo_segundos,
+    lote=settings.correo_lote,
+    max_intentos=settings.correo_max_intentos,
+    reintento_base_segundos=settings.correo_reintento_base_segundos,
+    reserva_segundos=settings.correo_reserva_segundos,
+)
@@ -19,6 +19,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def claims_de_usuario(user) -> dict:
+    """Claims con los que get_current_claims autoriza sin ir a la BD."""
+    return {
+        "sub": user.username,
+        "role": user.role_id,
+        "uid": user.id,
+        "role_id": user.role_id,
+        "full_name": user.full_name,
+        "enabled": bool(user.enabled),
+        "tv": user.token_version or 0,
+    }
+
+
 def decode_access_token(token: str) -> dict:
     try:
         decoded_token = jwt.decode(token, SECRET_KEY, algorithms=[ALOGRITHM])
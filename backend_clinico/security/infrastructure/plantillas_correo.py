@@ -0,0 +1,90 @@
+"""
+Plantillas de los correos de SIRA (security/resource/templates).
+
+Se leen y compilan una sola vez al importar el módulo: el bloque de cada mensaje se
+inserta en el layout compartido, el asunto se fija, y el resultado se parte en trozos
+estáticos y huecos `{{ campo }}`. Renderizar un correo solo escapa y coloca los campos
+variables; todo el HTML/CSS fijo es el mismo string reutilizado en cada mensaje.
+"""
+import html
+import os
+import re
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "templates")
+
+# Asunto y archivos de cada mensaje (<nombre>.html es el bloque del layout, <nombre>.txt la versión de texto)
+MENSAJES = {
+    "credenciales": "Bienvenido/a a SIRA – Tu cuenta ha sido creada",
+    "cambio_password": "SIRA – Tu contraseña ha sido actualizada",
+}
+
+_CAMPO = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_INCLUSION = re.compile(r"^([ \t]*)\{\{>\s*(\w+)\s*\}\}[ \t]*\n?", re.M)
+
+
+class PlantillaCompilada:
+    """Texto partido en trozos fijos y huecos; `renderizar` solo rellena los huecos."""
+
+    def __init__(self, texto: str, escapar: bool):
+        self.escapar = escapar
+        self._partes = []
+        self._huecos = []
+        posicion = 0
+        for coincidencia in _CAMPO.finditer(texto):
+            self._partes.append(texto[posicion:coincidencia.start()])
+            self._huecos.append((len(self._partes), coincidencia.group(1)))
+            self._partes.append("")
+            posicion = coincidencia.end()
+        self._partes.append(texto[posicion:])
+        self.campos = frozenset(campo for _indice, campo in self._huecos)
+
+    def renderizar(self, valores: dict) -> str:
+        partes = self._partes.copy()
+        convertir = html.escape if self.escapar else str
+        try:
+            for indice, campo in self._huecos:
+                partes[indice] = convertir(str(valores[campo]))
+        except KeyError as error:
+            raise ValueError(f"Falta el campo {error.args[0]} en la plantilla") from None
+        return "".join(partes)
+
+
+def _leer(directorio: str, nombre: str) -> str:
+    with open(os.path.join(directorio, nombre), encoding="utf-8") as archivo:
+        return archivo.read()
+
+
+def _incluir(layout: str, bloques: dict) -> str:
+    """Reemplaza cada `{{> bloque }}` del layout por el bloque, con la sangría de esa línea."""
+    def reemplazo(coincidencia):
+        sangria, nombre = coincidencia.groups()
+        return "".join(sangria + linea if linea.strip() else linea for linea in bloques[nombre].splitlines(True)) + "\n"
+    return _INCLUSION.sub(reemplazo, layout)
+
+
+class PlantillasCorreo:
+    def __init__(self, directorio: str = DIRECTORIO_PLANTILLAS):
+        layout = _leer(directorio, "layout.html")
+        self._mensajes = {}
+        for nombre, asunto in MENSAJES.items():
+            pagina = _incluir(layout, {"cuerpo": _leer(directorio, f"{nombre}.html")})
+            # El asunto es fijo por mensaje: se resuelve al compilar, no en cada envío
+            pagina = pagina.replace("{{ asunto }}", html.escape(asunto))
+            self._mensajes[nombre] = (
+                asunto,
+                PlantillaCompilada(_leer(directorio, f"{nombre}.txt"), escapar=False),
+                PlantillaCompilada(pagina, escapar=True),
+            )
+
+    def renderizar(self, nombre: str, **campos) -> tuple[str, str, str]:
+        """Asunto, texto plano y HTML del mensaje `nombre` con los campos dados."""
+        asunto, texto, pagina = self._mensajes[nombre]
+        return asunto, texto.renderizar(campos), pagina.renderizar(campos)
+
+    def renderizar_lote(self, nombre: str, lista_campos: list[dict]) -> list[tuple[str, str, str]]:
+        """Varios correos del mismo mensaje (p. ej. al aprobar un lote de solicitudes)."""
+        asunto, texto, pagina = self._mensajes[nombre]
+        return [(asunto, texto.renderizar(campos), pagina.renderizar(campos)) for campos in lista_campos]
+
+
+plantillas_correo = PlantillasCorreo()
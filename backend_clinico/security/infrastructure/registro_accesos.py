@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import bindparam, update
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.models.conection.conection_async import async_engine
+from backend_clinico.security.domain.model.user import User
+
+
+_ACTUALIZAR_ACCESO = (
+    update(User.__table__)
+    .where(User.__table__.c.id == bindparam("b_id"))
+    .values(ultimo_accesso=bindparam("b_acceso"))
+)
+
+
+class RegistroAccesos:
+    """
+    Escribe `ultimo_accesso` fuera del request de login.
+
+    Con `intervalo_segundos` > 0 los accesos se juntan en memoria (el último por usuario)
+    y se vuelcan en una sola transacción con un UPDATE por lote (executemany): una ola de
+    logins al abrir la clínica se convierte en una escritura cada intervalo. Con 0 cada
+    login hace un único `UPDATE ... WHERE id=?`, sin cargar ni refrescar el usuario.
+    """
+
+    def __init__(self, intervalo_segundos: float):
+        self.intervalo = intervalo_segundos
+        self._pendientes = {}
+        self._tarea = None
+        self.registrados = 0
+        self.volcados = 0
+        self.filas_escritas = 0
+        self.errores = 0
+
+    async def registrar(self, user_id: int, momento: datetime | None = None):
+        momento = momento or datetime.now()
+        self.registrados += 1
+        if self.intervalo <= 0:
+            await self._escribir({user_id: momento})
+        else:
+            self._pendientes[user_id] = momento
+
+    async def _escribir(self, accesos: dict):
+        async with async_engine.begin() as conexion:
+            await conexion.execute(
+                _ACTUALIZAR_ACCESO, [{"b_id": user_id, "b_acceso": momento} for user_id, momento in accesos.items()]
+            )
+        self.filas_escritas += len(accesos)
+
+    async def volcar(self):
+        if not self._pendientes:
+            return
+        accesos, self._pendientes = self._pendientes, {}
+        try:
+            await self._escribir(accesos)
+            self.volcados += 1
+        except Exception as e:
+            self.errores += 1
+            print(f"Error al guardar último acceso de {len(accesos)} usuarios: {e}")
+            # Se reintenta en el próximo volcado, sin pisar accesos más nuevos
+            for user_id, momento in accesos.items():
+                self._pendientes.setdefault(user_id, momento)
+
+    async def _bucle(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            await self.volcar()
+
+    def iniciar(self):
+        if self.intervalo > 0 and self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+        await self.volcar()
+
+    def estadisticas(self) -> dict:
+        return {
+            "intervalo_segundos": self.intervalo,
+            "pendientes": len(self._pendientes),
+            "registrados": self.registrados,
+            "volcados": self.volcados,
+            "filas_escritas": self.filas_escritas,
+            "errores": self.errores,
+        }
+
+
+registro_accesos = RegistroAccesos(settings.ultimo_acceso_intervalo_segundos)
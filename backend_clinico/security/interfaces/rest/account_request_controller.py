@@ -1,15 +1,21 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from pydantic import BaseModel, EmailStr
 
+from backend_clinico.app.core.config import settings
+from backend_clinico.security.application.account_request_service import AccountRequestService
 from backend_clinico.security.domain.model.account_request import AccountRequest
 from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.repository.account_request_repository import AccountRequestRepository
 from backend_clinico.security.domain.repository.notification_repository import NotificationRepository
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_db
-from backend_clinico.security.application.password_utils import hash_password
-from backend_clinico.security.domain.repository.user_repository import UserRepository, send_credentials_email
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_db, get_current_claims
+from backend_clinico.security.application.password_utils import hash_password_async
+from backend_clinico.security.domain.repository.email_outbox_repository import EmailOutboxRepository
+from backend_clinico.security.domain.repository.user_repository import UserRepository, correo_credenciales
+from backend_clinico.security.infrastructure.despachador_correos import despachador_correos
 from backend_clinico.security.domain.repository.role_repository import RoleRepository
 from backend_clinico.security.resource.request.user_request import CreateUserFromRequestInput
 
@@ -73,7 +79,7 @@ class ApproveRequestInput(BaseModel):
     password: str  # contraseña temporal asignada por el admin
 
 @router_account.post("/{request_id}/create-user", summary="Crear usuario desde solicitud aprobada")
-def crear_usuario_desde_solicitud(
+async def crear_usuario_desde_solicitud(
     request_id: int,
     data: ApproveRequestInput,  # Usamos el modelo correcto
     db: Session = Depends(get_db),
@@ -83,6 +89,12 @@ def crear_usuario_desde_solicitud(
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
 
+    # El hash corre en el pool de contraseñas sin ocupar un hilo; las consultas, en el threadpool
+    hashed_password = await hash_password_async(data.password)
+    return await run_in_threadpool(_crear_usuario_desde_solicitud, db, request_id, data, hashed_password)
+
+
+def _crear_usuario_desde_solicitud(db: Session, request_id: int, data: ApproveRequestInput, hashed_password: str):
     # Buscar la solicitud
     repo = AccountRequestRepository()
     
@@ -104,28 +116,58 @@ def crear_usuario_desde_solicitud(
         username=data.username,
         email=solicitud.email,
         full_name=solicitud.full_name,
-        hashed_password=hash_password(data.password),  # Guardamos la contraseña hasheada
+        hashed_password=hashed_password,  # Guardamos la contraseña hasheada
         enabled=True,
         role_id=role.id,
         area=solicitud.area
     ))
 
-    # Enviar las credenciales por correo
-    send_credentials_email(
-        to_email=solicitud.email,
-        username=data.username,
-        password=data.password  # Se envía la contraseña en texto plano SOLO por correo
-    )
+    # Encolar las credenciales por correo (la contraseña en texto plano va SOLO en el correo y se borra al enviarlo)
+    EmailOutboxRepository().encolar(db, solicitud.email, *correo_credenciales(data.username, data.password))
+    despachador_correos.avisar()
 
     return {"message": "Usuario creado exitosamente", "user": new_user}
 
 
+class BulkCreateUserItem(ApproveRequestInput):
+    request_id: int
+
+class BulkCreateUsersInput(BaseModel):
+    items: List[BulkCreateUserItem]
+
+@router_account.post("/bulk-create-users", summary="Aprobar solicitudes y crear sus usuarios en lote")
+async def crear_usuarios_en_lote(
+    data: BulkCreateUsersInput,
+    db: Session = Depends(get_db),
+    current_user: TokenClaims = Depends(get_current_claims)
+):
+    # Solo admin
+    if current_user.role_id != 1:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    if not data.items:
+        raise HTTPException(status_code=400, detail="El lote está vacío")
+    if len(data.items) > settings.aprobacion_lote_maximo:
+        raise HTTPException(status_code=400, detail=f"El lote supera el máximo de {settings.aprobacion_lote_maximo} solicitudes")
+
+    resultados = await AccountRequestService().aprobar_y_crear_usuarios(db, data.items)
+    creados = sum(1 for resultado in resultados if resultado["ok"])
+    if creados:
+        despachador_correos.avisar()
+
+    return {
+        "message": f"{creados} de {len(resultados)} usuarios creados",
+        "creados": creados,
+        "fallidos": len(resultados) - creados,
+        "resultados": resultados,
+    }
+
+
 
 
 @router_account.get("/", response_model=List[dict])
 def get_all_account_requests(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
     ):
     """
     Obtiene todos los registros de la tabla AccountRequest.
@@ -1,36 +1,36 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend_clinico.security.application.auth_service import AuthService
-from backend_clinico.security.application.password_utils import verify_password
+from backend_clinico.security.application.password_utils import hash_password_async, verify_password
 
 from backend_clinico.security.domain.model.auth_token import TokenResponse
 from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.repository.user_repository import UserRepository
 from backend_clinico.security.resource.request.user_request import UserLogin, UserRegister
-from backend_clinico.security.infrastructure.auth_dependencies import get_db
-from backend_clinico.security.infrastructure.jwt_handler import create_access_token
+from backend_clinico.security.infrastructure.auth_dependencies import get_async_db, get_db
+from backend_clinico.security.infrastructure.jwt_handler import claims_de_usuario, create_access_token
+from backend_clinico.security.infrastructure.registro_accesos import registro_accesos
 from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
 
 router_auth = APIRouter(prefix="/auth", tags=["Autenticación"])
 
 
 @router_auth.post("/login", summary="Iniciar sesión y obtener token")
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     auth_service = AuthService(UserRepository()) 
-    user = auth_service.authenticate_user(db, credentials.username, credentials.password)
+    user = await auth_service.authenticate_user_async(db, credentials.username, credentials.password)
 
     if not user:
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
-    # Actualizar el último acceso
-    user.ultimo_accesso = datetime.now()
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Actualizar el último acceso: un UPDATE por id (o diferido y agrupado), sin commit ni refresh del usuario
+    await registro_accesos.registrar(user.id, datetime.now())
 
-    token = create_access_token(data={"sub": user.username, "role": user.role_id})
+    token = create_access_token(data=claims_de_usuario(user))
     return TokenResponse(
         access_token=token,
         token_type="bearer",
@@ -42,20 +42,22 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router_auth.post("/register", summary="Registrar nuevo usuario")
-def register(data: UserRegister, 
+async def register(data: UserRegister, 
              db: Session = Depends(get_db),
              current_user: User = Depends(get_current_user)
              ):
 
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
-    existing = AuthService.user_exists(db, data.username, data.email)
+    existing = await run_in_threadpool(AuthService.user_exists, db, data.username, data.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Nombre de usuario o correo ya registrado"
         )
-    user = AuthService.register_user(db, data)
+    # El hash corre en el pool de contraseñas sin ocupar un hilo; las consultas, en el threadpool
+    hashed_password = await hash_password_async(data.password)
+    user = await run_in_threadpool(AuthService.register_user, db, data, hashed_password)
     return {"message": "Usuario registrado correctamente", "user": user}
 
 
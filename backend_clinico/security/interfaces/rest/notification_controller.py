@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
 
+from backend_clinico.app.core.paginacion import ParametrosPagina
 from backend_clinico.app.models.conection.dependency import get_db
 from backend_clinico.security.application.notification_service import NotificationService
 from backend_clinico.security.domain.repository.notification_repository import NotificationRepository
 from backend_clinico.security.domain.model.user import User
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_user, get_current_claims
 
 router_notification = APIRouter(prefix="/notifications", tags=["Notificaciones"])
 
@@ -13,14 +15,16 @@ def verificar_admin(current_user: User):
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-@router_notification.get("/", summary="Mostrar todas las notificaciones (solo admin)")
+@router_notification.get("/", summary="Mostrar notificaciones, las más recientes primero (solo admin)")
 def mostrar_todo_notification(
+    response: Response,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_admin(current_user)
     service = NotificationService(NotificationRepository())
-    notificaciones = service.mostrar_todo(db)
+    notificaciones = service.mostrar_todo(db, pagina).responder(response)
     return {"notificaciones": notificaciones}
 
 @router_notification.delete("/{notif_id}", summary="Eliminar notificación por ID (solo admin)")
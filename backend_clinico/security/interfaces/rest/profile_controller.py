@@ -1,18 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 
-from backend_clinico.app.models.conection.conection import get_session
 from backend_clinico.app.models.conection.dependency import get_db
 from backend_clinico.security.application.profile_service import ProfileService
-from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.repository.profile_repository import  ProfileRepository
-from backend_clinico.security.infrastructure.auth_dependencies import get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_current_claims
 from backend_clinico.security.resource.request.profile_update_null import ProfileUpdateNullInput
 
 router_profile = APIRouter(prefix="/profiles", tags=["Profiles"])
 
 
-def verificar_permisos(current_user: User):
+def verificar_permisos(current_user: TokenClaims):
     if current_user.role_id not in [1, 2, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
 
@@ -20,7 +19,7 @@ def verificar_permisos(current_user: User):
 def update_null_profile_fields(
     user_id: int, 
     data: ProfileUpdateNullInput, 
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_db)
 ):
     service = ProfileService(ProfileRepository())
     
@@ -44,8 +43,8 @@ def update_null_profile_fields(
 @router_profile.get("/{user_id}", summary="Obtener perfil por ID de usuario")
 def get_profile_by_user_id(
     user_id: int,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db),
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     verificar_permisos(current_user)
     service = ProfileService(ProfileRepository())
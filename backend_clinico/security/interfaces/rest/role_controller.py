@@ -5,7 +5,8 @@ from backend_clinico.security.domain.model.role import Role
 from backend_clinico.security.application.role_service import RoleService
 from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.repository.role_repository import RoleRepository
-from backend_clinico.security.infrastructure.auth_dependencies import get_db, get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_db, get_current_user, get_current_claims
 
 router_role = APIRouter(prefix="/roles", tags=["Roles"])
 
@@ -13,7 +14,7 @@ router_role = APIRouter(prefix="/roles", tags=["Roles"])
 @router_role.get("/", summary="Listar roles")
 def listar_roles(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
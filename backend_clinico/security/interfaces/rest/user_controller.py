@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from typing import List
 
+from backend_clinico.app.core.paginacion import ParametrosPagina
 from backend_clinico.security.application.UserService import UserService
-from backend_clinico.security.infrastructure.auth_dependencies import get_db, get_current_user
+from backend_clinico.security.domain.model.auth_token import TokenClaims
+from backend_clinico.security.infrastructure.auth_dependencies import get_db, get_current_user, get_current_claims
 from backend_clinico.security.domain.model.user import User
-from backend_clinico.security.domain.repository.user_repository import UserRepository,  send_password_change_email
+from backend_clinico.security.domain.repository.email_outbox_repository import EmailOutboxRepository
+from backend_clinico.security.domain.repository.user_repository import UserRepository, correo_cambio_password
+from backend_clinico.security.infrastructure.despachador_correos import despachador_correos
 from backend_clinico.security.resource.request.user_request import UserPasswordChangeRequest, UserUpdateRequest
 from backend_clinico.security.resource.response.user_response import MedicoResponse
 
@@ -15,16 +20,20 @@ def verificar_permisos(current_user: User):
     if current_user.role_id not in [1, 2, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-@router_user.get("/", summary="Listar todos los usuarios", response_model=List[User])
+@router_user.get("/", summary="Listar usuarios (paginado por ID)", response_model=List[User])
 def listar_usuarios(
+    response: Response,
+    role_id: int = None,
+    enabled: bool = None,
+    pagina: ParametrosPagina = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
 
     user_service = UserService(UserRepository())
-    return user_service.get_all_users(db)
+    return user_service.get_all_users(db, pagina, role_id, enabled).responder(response)
 
 
 @router_user.get(
@@ -34,7 +43,7 @@ def listar_usuarios(
 )
 def listar_medicos(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id not in [1, 3]:
         raise HTTPException(status_code=403, detail="No autorizado")
@@ -47,7 +56,7 @@ def listar_medicos(
 def obtener_usuario(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     if current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="No autorizado")
@@ -95,7 +104,7 @@ def actualizar_usuario(
 
 
 @router_user.put("/{user_id}/change-password", summary="Cambiar contraseña del usuario")
-def cambiar_contraseña(
+async def cambiar_contraseña(
     user_id: int,
     data: UserPasswordChangeRequest,
     db: Session = Depends(get_db),
@@ -107,19 +116,17 @@ def cambiar_contraseña(
     
     try:
         # Primero obtenemos los datos del usuario antes del cambio
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await run_in_threadpool(lambda: db.query(User).filter(User.id == user_id).first())
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        email, username = user.email, user.username
         
         # Cambiamos la contraseña
-        updated_user = user_service.change_password(db, user_id, data.old_password, data.new_password)
+        updated_user = await user_service.change_password(db, user_id, data.old_password, data.new_password)
         
-        # Enviamos el correo específico para cambio de contraseña
-        send_password_change_email(
-            to_email=user.email,
-            username=user.username,
-            new_password=data.new_password
-        )
+        # Encolamos el correo específico para cambio de contraseña
+        await run_in_threadpool(EmailOutboxRepository().encolar, db, email, *correo_cambio_password(username, data.new_password))
+        despachador_correos.avisar()
         
         return {
             "message": "Contraseña actualizada correctamente y correo de notificación enviado", 
@@ -128,5 +135,8 @@ def cambiar_contraseña(
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        # 404 de arriba o 503 del pool de contraseñas lleno: llegan tal cual al cliente
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al procesar solicitud: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Benchmark de la tubería de diagnóstico, etapa por etapa.
+
+Genera notas clínicas sintéticas en español de distinta longitud y mide, para llamadas
+individuales y por lotes, cuánto tarda cada etapa (normalización, cada vectorizador,
+hstack, modelo, inverse_transform) y la predicción completa. Reporta p50/p95/p99,
+casos por segundo y pico de memoria, y guarda todo en JSON para comparar entre commits.
+
+Funciona sin red: `--stub-embedder` reemplaza el transformer por un embedder de
+n-gramas de caracteres y, si falta el pickle del modelo, se entrena un bosque
+sintético con las mismas dimensiones de entrada.
+
+Uso (desde la raíz del repositorio):
+    python -m backend_clinico.tools.benchmark_inferencia --stub-embedder
+    python -m backend_clinico.tools.benchmark_inferencia --lotes 1,16,64 --repeticiones 50 --salida bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import zlib
+
+import numpy as np
+from scipy.sparse import hstack
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.services import prediccion_service
+from backend_clinico.app.services.prediccion_service import (
+    cache_predicciones,
+    clasificar_grupo_zona,
+    predecir_detalle_lote,
+    registro,
+    sinonimos,
+    _vector_numerico,
+)
+from backend_clinico.app.services.registro_modelos import memoria_residente_bytes
+
+
+LONGITUDES = {"corta": (3, 8), "media": (15, 30), "larga": (60, 120)}
+
+RELLENO = [
+    "paciente", "refiere", "desde", "hace", "dias", "con", "sin", "leve", "moderado", "intenso",
+    "presenta", "niega", "fiebre", "malestar", "general", "nocturno", "persistente", "episodios",
+    "al", "de", "la", "el", "y", "en", "por", "tratamiento", "previo", "mejoria", "empeora",
+    "auscultacion", "murmullo", "vesicular", "conservado", "eritema", "congestion", "cefalea",
+]
+
+# clasificar_grupo_zona devuelve "otro" (desconocido para encoder_gz) si el texto no nombra
+# ninguna zona, así que cada nota sintética arranca con uno de estos términos
+TERMINOS_ZONA = ["tos productiva", "roncus", "dolor de garganta", "ganglios inflamados", "ronquera", "dolor al hablar"]
+
+
+class EmbedderStub:
+    """Embedder determinista de bigramas de caracteres, para medir sin descargar el transformer."""
+
+    dimension = 256
+
+    def encode(self, textos, batch_size: int = 64, convert_to_numpy: bool = True, **kwargs):
+        unico = isinstance(textos, str)
+        lista = [textos] if unico else list(textos)
+        matriz = np.zeros((len(lista), self.dimension), dtype=np.float32)
+        for fila, texto in enumerate(lista):
+            texto = f" {texto} "
+            for i in range(len(texto) - 1):
+                matriz[fila, zlib.crc32(texto[i:i + 2].encode("utf-8")) % self.dimension] += 1.0
+        return matriz[0] if unico else matriz
+
+
+def generar_nota(rng: random.Random, longitud: str) -> str:
+    minimo, maximo = LONGITUDES[longitud]
+    terminos = [t for canonico, variantes in sinonimos.items() for t in (canonico, *variantes)]
+    palabras = rng.choice(TERMINOS_ZONA).split()
+    while len(palabras) < rng.randint(minimo, maximo):
+        if rng.random() < 0.3:
+            palabras.extend(rng.choice(terminos).split())
+        else:
+            palabras.append(rng.choice(RELLENO))
+    nota = " ".join(palabras)
+    # Algo de ruido real: mayúsculas, signos y tildes que limpiar_texto debe quitar
+    return nota.capitalize() + rng.choice([".", ",", ";", " (control)", "."])
+
+
+def generar_casos(cantidad: int, longitud: str, semilla: int) -> list[dict]:
+    rng = random.Random(semilla)
+    return [
+        {
+            "temperatura": round(rng.uniform(36.0, 40.0), 1),
+            "edad": rng.randint(1, 90),
+            "f_card": rng.randint(55, 130),
+            "f_resp": rng.randint(12, 35),
+            "talla": round(rng.uniform(0.8, 1.95), 2),
+            "peso": round(rng.uniform(10, 110), 1),
+            "genero": rng.choice(["M", "F"]),
+            "motivo_consulta": generar_nota(rng, longitud),
+            "examenfisico": generar_nota(rng, longitud),
+        }
+        for _ in range(cantidad)
+    ]
+
+
+def registrar_modelo_sintetico(semilla: int):
+    """Entrena un bosque pequeño con el mismo ancho de entrada que espera la tubería."""
+    def fabrica():
+        from sklearn.ensemble import RandomForestClassifier
+
+        ancho = 7
+        for nombre in ("vectorizer_motivo", "vectorizer_examen", "vectorizer_texto"):
+            ancho += len(registro.obtener(nombre).vocabulary_)
+        ancho += np.asarray(registro.obtener("encoder_gz").transform(["faringe"])).reshape(1, -1).shape[1]
+        clases = len(registro.obtener("label_encoder").classes_)
+
+        rng = np.random.default_rng(semilla)
+        X = rng.random((clases * 40, ancho))
+        y = np.arange(clases * 40) % clases
+        return RandomForestClassifier(n_estimators=100, random_state=semilla, n_jobs=1).fit(X, y)
+
+    registro.registrar("modelo", fabrica)
+
+
+def resumir(muestras: list[float], casos_por_llamada: int) -> dict:
+    ms = np.array(muestras) * 1000.0
+    total = float(np.sum(muestras))
+    return {
+        "llamadas": len(muestras),
+        "media_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "casos_por_segundo": round(len(muestras) * casos_por_llamada / total, 2) if total else None,
+    }
+
+
+def medir_etapas(casos: list[dict]) -> dict:
+    """Repite las etapas de `_predecir_normalizados` con un cronómetro entre cada una."""
+    tiempos = {}
+
+    def cronometrar(etapa, funcion, *args):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos[etapa] = time.perf_counter() - inicio
+        return resultado
+
+    n = len(casos)
+    normalizador = registro.obtener("normalizador")
+    X_num = np.array([_vector_numerico(caso) for caso in casos], dtype=float)
+    normalizados = cronometrar(
+        "normalizar_texto",
+        normalizador.normalizar_lote,
+        [caso["motivo_consulta"] for caso in casos] + [caso["examenfisico"] for caso in casos],
+    )
+    motivos, examenes = normalizados[:n], normalizados[n:]
+    textos = [m + " " + e for m, e in zip(motivos, examenes)]
+
+    X_motivo = cronometrar("vectorizer_motivo", registro.obtener("vectorizer_motivo").transform, motivos)
+    X_examen = cronometrar("vectorizer_examen", registro.obtener("vectorizer_examen").transform, examenes)
+    X_texto = cronometrar("vectorizer_texto", lambda t: registro.obtener("vectorizer_texto").transform(t).multiply(2.0), textos)
+    gz = cronometrar(
+        "encoder_gz",
+        lambda t: registro.obtener("encoder_gz").transform([clasificar_grupo_zona(x) for x in t]).reshape(n, -1),
+        textos,
+    )
+    X_final = cronometrar("hstack", lambda: hstack([X_num, X_motivo, X_examen, X_texto, gz]).tocsr())
+    modelo = registro.obtener("modelo")
+    probabilidades = cronometrar("modelo.predict_proba", modelo.predict_proba, X_final)
+    cronometrar(
+        "inverse_transform",
+        lambda: registro.obtener("label_encoder").inverse_transform(modelo.classes_[probabilidades.argmax(axis=1)]),
+    )
+    return tiempos
+
+
+def limpiar_caches(con_cache: bool):
+    if con_cache:
+        return
+    cache_predicciones.limpiar()
+    normalizador = registro.obtener("normalizador")
+    normalizador.cache.limpiar()
+    # En frío tampoco se consulta la tabla precalculada ni la caché en disco
+    normalizador.tabla = {}
+    normalizador.almacen = None
+
+
+def ejecutar(args) -> dict:
+    if args.stub_embedder:
+        registro.registrar("embedder", EmbedderStub)
+        # La caché en disco y la tabla van con la clave del modelo real: el stub no debe
+        # leer sus mapeos ni escribir los suyos bajo esa clave
+        settings.normalizador_cache_disco = None
+        settings.normalizador_tabla = None
+    ruta_modelo = f"{settings.modelos_directorio}/model/modelo_rf_mejorado.pkl"
+    sintetico = args.modelo_sintetico or not os.path.exists(ruta_modelo)
+    if sintetico:
+        registrar_modelo_sintetico(args.semilla)
+
+    rss_inicial = memoria_residente_bytes()
+    inicio_carga = time.perf_counter()
+    prediccion_service.precargar_modelos()
+    registro.obtener("modelo")
+    segundos_carga = time.perf_counter() - inicio_carga
+
+    resultados = {}
+    for longitud in args.longitudes:
+        casos = generar_casos(max(args.lotes) * args.repeticiones, longitud, args.semilla)
+        # Calentamiento: primera llamada a cada artefacto fuera de la medición
+        predecir_detalle_lote(casos[:2])
+
+        por_lote = {}
+        for tamano in args.lotes:
+            etapas = {}
+            completas = []
+            for repeticion in range(args.repeticiones):
+                lote = casos[repeticion * tamano:(repeticion + 1) * tamano]
+                limpiar_caches(args.con_cache)
+                for etapa, segundos in medir_etapas(lote).items():
+                    etapas.setdefault(etapa, []).append(segundos)
+
+                limpiar_caches(args.con_cache)
+                inicio = time.perf_counter()
+                predecir_detalle_lote(lote)
+                completas.append(time.perf_counter() - inicio)
+
+            por_lote[str(tamano)] = {
+                "etapas": {etapa: resumir(muestras, tamano) for etapa, muestras in etapas.items()},
+                "prediccion_completa": resumir(completas, tamano),
+            }
+            completa = por_lote[str(tamano)]["prediccion_completa"]
+            print(f"[{longitud:5}] lote={tamano:4}  p50={completa['p50_ms']:9.3f} ms  "
+                  f"p99={completa['p99_ms']:9.3f} ms  {completa['casos_por_segundo']} casos/s")
+        resultados[longitud] = por_lote
+
+    return {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "configuracion": {
+            "lotes": args.lotes,
+            "repeticiones": args.repeticiones,
+            "longitudes": args.longitudes,
+            "semilla": args.semilla,
+            "con_cache": args.con_cache,
+            "embedder": "stub" if args.stub_embedder else f"{settings.embedder_modelo}:{settings.embedder_backend}",
+            "modelo_sintetico": sintetico,
+        },
+        "carga": {
+            "segundos": round(segundos_carga, 3),
+            "rss_delta_mb": round((memoria_residente_bytes() - rss_inicial) / (1024 * 1024), 2),
+        },
+        "resultados": resultados,
+        "rss_pico_mb": round(rss_pico_bytes() / (1024 * 1024), 2),
+    }
+
+
+def rss_pico_bytes() -> int:
+    try:
+        import resource
+        # ru_maxrss está en KB en Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return memoria_residente_bytes()
+
+
+def commit_actual() -> str | None:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lotes", default="1,8,32,128", help="Tamaños de lote separados por coma")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--longitudes", default="corta,media,larga", help=f"Subconjunto de {', '.join(LONGITUDES)}")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--stub-embedder", action="store_true", help="No carga el transformer (sin red)")
+    parser.add_argument("--modelo-sintetico", action="store_true", help="Usa un bosque sintético aunque exista el pickle")
+    parser.add_argument("--con-cache", action="store_true", help="Mide con las cachés calientes en lugar de vaciarlas")
+    parser.add_argument("--salida", default="benchmark_inferencia.json")
+    args = parser.parse_args()
+    args.lotes = [int(valor) for valor in args.lotes.split(",")]
+    args.longitudes = [valor for valor in args.longitudes.split(",") if valor in LONGITUDES]
+
+    reporte = ejecutar(args)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida} (pico de RSS: {reporte['rss_pico_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark de inicio de sesión: cuántas verificaciones de contraseña por segundo (y por núcleo)
+da cada costo de bcrypt / argon2 con el pool dedicado de contraseñas.
+
+Por defecto mide sin servidor, con el mismo EjecutorPasswords que usa /auth/login, para cada
+combinación de `--esquemas`, `--rondas` e `--hilos`. Con `--url` además lanza logins reales
+concurrentes contra una API corriendo y mide logins por segundo de punta a punta.
+
+Uso (desde la raíz del repositorio):
+    python -m backend_clinico.tools.benchmark_login
+    python -m backend_clinico.tools.benchmark_login --rondas 10,11,12 --hilos 1,2,4 --verificaciones 200
+    python -m backend_clinico.tools.benchmark_login --url http://127.0.0.1:8000 --usuario admin --contrasena admin123
+"""
+import argparse
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from passlib.context import CryptContext
+
+from backend_clinico.security.application.password_utils import EjecutorPasswords
+
+
+def _lista_enteros(texto: str) -> list[int]:
+    return [int(valor) for valor in texto.split(",") if valor.strip()]
+
+
+def medir_pool(contexto: CryptContext, hilos: int, verificaciones: int) -> dict:
+    hash_guardado = contexto.hash("contrasena-de-prueba")
+    ejecutor = EjecutorPasswords(hilos, cola_maxima=0)
+    # Calentamiento: arranca los hilos del pool
+    wait([ejecutor.enviar("verificar", contexto.verify, "contrasena-de-prueba", hash_guardado) for _ in range(hilos)])
+
+    inicio = time.perf_counter()
+    futuros = [ejecutor.enviar("verificar", contexto.verify, "contrasena-de-prueba", hash_guardado) for _ in range(verificaciones)]
+    wait(futuros)
+    total = time.perf_counter() - inicio
+    estadisticas = ejecutor.estadisticas()
+    ejecutor._pool.shutdown()
+
+    por_segundo = verificaciones / total
+    nucleos = min(hilos, os.cpu_count() or 1)
+    return {
+        "hilos": hilos,
+        "logins_por_segundo": round(por_segundo, 2),
+        "logins_por_segundo_por_nucleo": round(por_segundo / nucleos, 2),
+        "verificacion_ms": estadisticas["calculo_medio_ms"],
+        "espera_media_ms": estadisticas["espera_media_ms"],
+    }
+
+
+def medir_api(url: str, usuario: str, contrasena: str, logins: int, concurrencia: int) -> dict:
+    cuerpo = json.dumps({"username": usuario, "password": contrasena}).encode("utf-8")
+
+    def uno(_):
+        peticion = urllib.request.Request(f"{url.rstrip('/')}/api/v1/auth/login", data=cuerpo, method="POST")
+        peticion.add_header("Content-Type", "application/json")
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(peticion, timeout=120) as respuesta:
+                estado = respuesta.status
+        except urllib.error.HTTPError as error:
+            estado = error.code
+        return estado, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concurrencia) as pool:
+        resultados = list(pool.map(uno, range(logins)))
+    total = time.perf_counter() - inicio
+
+    latencias = sorted(segundos for _estado, segundos in resultados)
+    estados = {}
+    for estado, _segundos in resultados:
+        estados[str(estado)] = estados.get(str(estado), 0) + 1
+    return {
+        "logins": logins,
+        "concurrencia": concurrencia,
+        "logins_por_segundo": round(logins / total, 2),
+        "p50_ms": round(latencias[len(latencias) // 2] * 1000, 1),
+        "p99_ms": round(latencias[min(int(len(latencias) * 0.99), len(latencias) - 1)] * 1000, 1),
+        "estados": estados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de hash de contraseñas y de /auth/login")
+    parser.add_argument("--esquemas", default="bcrypt", help="bcrypt y/o argon2, separados por coma")
+    parser.add_argument("--rondas", default="10,12", help="Costos de bcrypt a medir")
+    parser.add_argument("--hilos", default=f"1,{os.cpu_count() or 1}", help="Tamaños del pool a medir")
+    parser.add_argument("--verificaciones", type=int, default=100)
+    parser.add_argument("--url", help="API corriendo para medir logins de punta a punta")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--contrasena")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=100)
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    resultados = {"nucleos": os.cpu_count(), "pool": [], "api": None}
+    for esquema in args.esquemas.split(","):
+        costos = _lista_enteros(args.rondas) if esquema == "bcrypt" else [None]
+        for rondas in costos:
+            opciones = {"bcrypt__rounds": rondas} if rondas else {}
+            contexto = CryptContext(schemes=[esquema], **opciones)
+            for hilos in _lista_enteros(args.hilos):
+                medicion = {"esquema": esquema, "rondas": rondas, **medir_pool(contexto, hilos, args.verificaciones)}
+                resultados["pool"].append(medicion)
+                print(
+                    f"{esquema:7} rondas={str(rondas):4} hilos={hilos:3} "
+                    f"{medicion['logins_por_segundo']:9.2f} logins/s  "
+                    f"{medicion['logins_por_segundo_por_nucleo']:8.2f} por núcleo  "
+                    f"verificación {medicion['verificacion_ms']:.1f} ms"
+                )
+
+    if args.url:
+        if not args.contrasena:
+            parser.error("--url necesita --contrasena")
+        resultados["api"] = medir_api(args.url, args.usuario, args.contrasena, args.logins, args.concurrencia)
+        print("API:", resultados["api"])
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
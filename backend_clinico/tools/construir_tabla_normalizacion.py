@@ -0,0 +1,72 @@
+"""
+Precalcula la tabla palabra -> canónico del normalizador clínico.
+
+El conjunto canónico es fijo por versión, así que el mapeo de cada palabra es
+determinista. La tabla cubre el vocabulario de los vectorizadores, el diccionario
+de sinónimos y las palabras de `motivo_consulta`/`examenfisico` ya guardadas en
+diagnósticos. En ejecución el normalizador la consulta antes que el embedder, y si
+todas las palabras están en la tabla torch ni siquiera se carga.
+
+Uso (desde la raíz del repositorio):
+    python -m backend_clinico.tools.construir_tabla_normalizacion
+    python -m backend_clinico.tools.construir_tabla_normalizacion --sin-bd --salida /tmp/tabla.json
+"""
+import argparse
+
+from sqlmodel import select
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.models.conection.conection import get_session
+from backend_clinico.app.models.domain.Diagnostico import Diagnostico
+from backend_clinico.app.services.embedders import BACKENDS_EMBEDDER, cargar_embedder
+from backend_clinico.app.services.normalizacion_service import NormalizadorTexto, clave_modelo, guardar_tabla, limpiar_texto
+from backend_clinico.app.services.prediccion_service import sinonimos, vocabulario_referencia
+
+
+def vocabulario_historico(normalizador: NormalizadorTexto) -> set[str]:
+    """Palabras de los diagnósticos guardados, tokenizadas igual que en `normalizar_lote`."""
+    palabras = set()
+    with get_session() as session:
+        consulta = select(Diagnostico.motivo_consulta, Diagnostico.examenfisico).execution_options(yield_per=1000)
+        for motivo, examen in session.exec(consulta):
+            for texto in (motivo, examen):
+                if texto:
+                    palabras.update(normalizador.reemplazar_sinonimos(limpiar_texto(texto)).split())
+    return palabras
+
+
+def construir_tabla(normalizador: NormalizadorTexto, palabras: list[str], tamano_bloque: int) -> dict:
+    tabla = {}
+    for inicio in range(0, len(palabras), tamano_bloque):
+        tabla.update(normalizador._calcular_mapeos(palabras[inicio:inicio + tamano_bloque]))
+        print(f"  {min(inicio + tamano_bloque, len(palabras))}/{len(palabras)} palabras")
+    return tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modelo", default=settings.embedder_modelo)
+    # La tabla solo se usa con el mismo backend que la generó: por defecto el configurado en el servidor
+    parser.add_argument("--backend", choices=BACKENDS_EMBEDDER, default=settings.embedder_backend)
+    parser.add_argument("--salida", default=settings.normalizador_tabla)
+    parser.add_argument("--sin-bd", action="store_true", help="No incluye el vocabulario de los diagnósticos guardados")
+    parser.add_argument("--tamano-bloque", type=int, default=2048)
+    args = parser.parse_args()
+
+    embedder = cargar_embedder(args.backend, args.modelo, settings.embedder_onnx_directorio)
+    normalizador = NormalizadorTexto(embedder, sinonimos, cache_tamano=0)
+
+    palabras = set(vocabulario_referencia())
+    if not args.sin_bd:
+        palabras |= vocabulario_historico(normalizador)
+    # Los canónicos se resuelven solos y no necesitan entrada
+    palabras = sorted(palabras - set(normalizador.canonicos))
+
+    print(f"Calculando {len(palabras)} mapeos con '{args.modelo}' ({args.backend})")
+    tabla = construir_tabla(normalizador, palabras, args.tamano_bloque)
+    guardar_tabla(args.salida, tabla, normalizador.canonicos, clave_modelo(args.modelo, args.backend), normalizador.version)
+    print(f"Tabla escrita en {args.salida}: {len(tabla)} palabras, {sum(c is not None for c in tabla.values())} con canónico")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Prueba de carga sobre GET /profiles/{user_id} para comprobar que el pool de conexiones
+no se agota: cada request debe devolver su sesión al terminar.
+
+Inicia sesión como admin, lanza `--peticiones` requests con `--concurrencia` hilos y
+compara /monitoreo/pool y /monitoreo/sesiones antes y después. Termina con código 1 si
+hubo timeouts del pool, errores 5xx o sesiones que quedaron abiertas.
+
+Uso (con la API corriendo):
+    python -m backend_clinico.tools.estres_perfiles --usuario admin --contrasena admin123
+    python -m backend_clinico.tools.estres_perfiles --url http://127.0.0.1:8000 --peticiones 5000 --concurrencia 64
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def pedir(url: str, metodo: str = "GET", cuerpo: dict | None = None, token: str | None = None, timeout: float = 60.0):
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else None
+    peticion = urllib.request.Request(url, data=datos, method=metodo)
+    peticion.add_header("Content-Type", "application/json")
+    if token:
+        peticion.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+            return respuesta.status, json.loads(respuesta.read() or b"null")
+    except urllib.error.HTTPError as error:
+        return error.code, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de /profiles/{user_id} y estado del pool de BD")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--contrasena", required=True)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=32)
+    args = parser.parse_args()
+
+    api = args.url.rstrip("/") + "/api/v1"
+    estado, login = pedir(f"{api}/auth/login", "POST", {"username": args.usuario, "password": args.contrasena})
+    if estado != 200:
+        sys.exit(f"No se pudo iniciar sesión ({estado})")
+    token = login["access_token"]
+
+    _, pool_antes = pedir(f"{api}/monitoreo/pool", token=token)
+    print("Pool antes:", pool_antes)
+
+    def una(_):
+        inicio = time.perf_counter()
+        estado, _cuerpo = pedir(f"{api}/profiles/{args.user_id}", token=token)
+        return estado, time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrencia) as pool:
+        resultados = list(pool.map(una, range(args.peticiones)))
+    total = time.perf_counter() - inicio
+
+    estados = {}
+    for estado, _segundos in resultados:
+        estados[estado] = estados.get(estado, 0) + 1
+    latencias = sorted(segundos for _estado, segundos in resultados)
+    print(f"{args.peticiones} peticiones en {total:.2f} s ({args.peticiones / total:.1f}/s), estados: {estados}")
+    print(f"p50 {latencias[len(latencias) // 2] * 1000:.1f} ms, p99 {latencias[int(len(latencias) * 0.99)] * 1000:.1f} ms")
+
+    _, pool_despues = pedir(f"{api}/monitoreo/pool", token=token)
+    _, sesiones = pedir(f"{api}/monitoreo/sesiones", token=token)
+    print("Pool después:", pool_despues)
+
+    problemas = []
+    errores = sum(conteo for estado, conteo in estados.items() if estado >= 500)
+    if errores:
+        problemas.append(f"{errores} respuestas 5xx")
+    if pool_antes and pool_despues and pool_despues.get("timeouts", 0) > pool_antes.get("timeouts", 0):
+        problemas.append(f"{pool_despues['timeouts'] - pool_antes['timeouts']} timeouts del pool")
+    # Solo queda abierta la sesión de la propia consulta a /monitoreo/sesiones
+    abiertas = [sesion for sesion in sesiones or [] if not sesion["origen"].endswith("/monitoreo/sesiones")]
+    if abiertas:
+        problemas.append(f"{len(abiertas)} sesiones abiertas: {abiertas[:5]}")
+
+    if problemas:
+        print("FALLA:", "; ".join(problemas))
+        sys.exit(1)
+    print("OK: el pool volvió a su estado inicial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Exporta el embedder del normalizador a ONNX y verifica que el canónico elegido
+para el vocabulario de referencia sea idéntico al del modelo PyTorch original.
+
+Uso (desde la raíz del repositorio):
+    python -m backend_clinico.tools.exportar_embedder --salida backend_clinico/external/embedder_onnx
+    python -m backend_clinico.tools.exportar_embedder --salida backend_clinico/external/embedder_onnx --cuantizar
+    python -m backend_clinico.tools.exportar_embedder --solo-paridad --backend torch-int8
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.services.embedders import (
+    ARCHIVO_METADATOS,
+    ARCHIVO_ONNX,
+    ARCHIVO_ONNX_INT8,
+    BACKENDS_EMBEDDER,
+    cargar_embedder,
+)
+from backend_clinico.app.services.normalizacion_service import NormalizadorTexto
+from backend_clinico.app.services.prediccion_service import sinonimos, vocabulario_referencia
+
+
+def exportar_onnx(modelo: str, salida: str, cuantizar: bool):
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+
+    os.makedirs(salida, exist_ok=True)
+    st = SentenceTransformer(modelo, device="cpu")
+    transformer = st[0]
+    tokenizer = transformer.tokenizer
+
+    class _Transformer(torch.nn.Module):
+        def __init__(self, modelo_hf):
+            super().__init__()
+            self.modelo_hf = modelo_hf
+
+        def forward(self, input_ids, attention_mask):
+            return self.modelo_hf(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    ejemplo = tokenizer(["dolor de garganta"], return_tensors="pt")
+    torch.onnx.export(
+        _Transformer(transformer.auto_model).eval(),
+        (ejemplo["input_ids"], ejemplo["attention_mask"]),
+        os.path.join(salida, ARCHIVO_ONNX),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "lote", 1: "secuencia"},
+            "attention_mask": {0: "lote", 1: "secuencia"},
+            "last_hidden_state": {0: "lote", 1: "secuencia"},
+        },
+        opset_version=14,
+    )
+    tokenizer.backend_tokenizer.save(os.path.join(salida, "tokenizer.json"))
+
+    capas_densas = []
+    for modulo in list(st)[1:]:
+        if isinstance(modulo, models.Pooling):
+            config = modulo.get_config_dict()
+            if not (config.get("pooling_mode_mean_tokens") or config.get("pooling_mode") == "mean"):
+                raise ValueError("Solo se soporta mean pooling en la exportación ONNX")
+        elif isinstance(modulo, models.Dense):
+            archivo = f"densa_{len(capas_densas)}.npz"
+            np.savez(
+                os.path.join(salida, archivo),
+                peso=modulo.linear.weight.detach().numpy(),
+                sesgo=modulo.linear.bias.detach().numpy(),
+            )
+            activacion = type(modulo.activation_function).__name__.lower()
+            capas_densas.append({"archivo": archivo, "activacion": "tanh" if activacion == "tanh" else "identidad"})
+        else:
+            raise ValueError(f"Módulo de SentenceTransformer no soportado: {type(modulo).__name__}")
+
+    if cuantizar:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            os.path.join(salida, ARCHIVO_ONNX),
+            os.path.join(salida, ARCHIVO_ONNX_INT8),
+            weight_type=QuantType.QInt8,
+        )
+
+    metadatos = {
+        "modelo": modelo,
+        "max_seq_length": st.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "capas_densas": capas_densas,
+        "cuantizado": cuantizar,
+    }
+    with open(os.path.join(salida, ARCHIVO_METADATOS), "w", encoding="utf-8") as archivo:
+        json.dump(metadatos, archivo, indent=2)
+    print(f"Embedder exportado en {salida}")
+
+
+def verificar_paridad(backend: str, modelo: str, directorio_onnx: str) -> list:
+    """Devuelve las palabras cuyo canónico difiere entre el backend torch y el indicado."""
+    vocabulario = vocabulario_referencia()
+    referencia = NormalizadorTexto(cargar_embedder("torch", modelo), sinonimos, cache_tamano=0)
+    candidato = NormalizadorTexto(cargar_embedder(backend, modelo, directorio_onnx), sinonimos, cache_tamano=0)
+
+    esperado = referencia._calcular_mapeos(vocabulario)
+    obtenido = candidato._calcular_mapeos(vocabulario)
+    diferencias = [(p, esperado[p], obtenido[p]) for p in vocabulario if esperado[p] != obtenido[p]]
+
+    print(f"Vocabulario de referencia: {len(vocabulario)} palabras, diferencias con '{backend}': {len(diferencias)}")
+    for palabra, canonico_torch, canonico_backend in diferencias:
+        print(f"  {palabra}: torch={canonico_torch} {backend}={canonico_backend}")
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modelo", default=settings.embedder_modelo)
+    parser.add_argument("--salida", default=settings.embedder_onnx_directorio)
+    parser.add_argument("--cuantizar", action="store_true", help="Genera además una versión ONNX int8")
+    parser.add_argument("--backend", choices=BACKENDS_EMBEDDER, default="onnx", help="Backend a comparar contra torch")
+    parser.add_argument("--solo-paridad", action="store_true", help="No exporta, solo verifica la paridad")
+    args = parser.parse_args()
+
+    if not args.solo_paridad:
+        exportar_onnx(args.modelo, args.salida, args.cuantizar)
+
+    diferencias = verificar_paridad(args.backend, args.modelo, args.salida)
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
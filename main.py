@@ -1,57 +1,69 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from sqlmodel import SQLModel
 
-from backend_clinico.app.models.conection.conection import engine, get_session
+from backend_clinico.app.models.conection.conection import engine, get_session, revisar_fugas
+from backend_clinico.app.models.conection.conection_async import async_engine
 from backend_clinico.security.application.password_utils import hash_password
 from backend_clinico.security.domain.model.user import User
 from backend_clinico.security.domain.model.role import Role
 from backend_clinico.security.domain.repository.role_repository import RoleRepository
 from backend_clinico.app.interfaces.api import routes
 from backend_clinico.security.domain.repository.user_repository import UserRepository
+from backend_clinico.security.infrastructure.despachador_correos import despachador_correos
+from backend_clinico.security.infrastructure.registro_accesos import registro_accesos
 from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.paginacion import ENCABEZADO_CURSOR, ENCABEZADO_TOTAL
+from backend_clinico.app.services.prediccion_service import detener_inferencia, iniciar_inferencia
 
 
 
 def init_roles():
-    db = get_session()
-    role_repo = RoleRepository()
-    roles = ["admin", "medico", "enfermero"]
-    for role_name in roles:
-        if not role_repo.get_by_name(db, role_name):
-            role_repo.create(db, Role(name=role_name))
+    with get_session() as db:
+        role_repo = RoleRepository()
+        roles = ["admin", "medico", "enfermero"]
+        for role_name in roles:
+            if not role_repo.get_by_name(db, role_name):
+                role_repo.create(db, Role(name=role_name))
 
 def init_admin_user():
-    db = get_session()
-    user_repo = UserRepository()
-    role_repo = RoleRepository()
-
-    # Obtener el rol admin
-    admin_role = role_repo.get_by_name(db, "admin")
-    if not admin_role:
-        print("Rol 'admin' no encontrado. No se puede crear el usuario admin.")
-        return
-
-    # Verificar si ya existe el admin
-    existing_admin = user_repo.get_by_username(db, settings.initial_admin_username)
-    if existing_admin:
-        print(f"Usuario admin '{settings.initial_admin_username}' ya existe.")
-        return
-
-    # Crear usuario admin con datos desde .env
-    admin_user = User(
-        username=settings.initial_admin_username,
-        email=settings.initial_admin_email,
-        full_name=settings.initial_admin_full_name,
-        hashed_password=hash_password(settings.initial_admin_password),
-        enabled=True,
-        role_id=admin_role.id,
-        area="Administración"  # Puedes poner otro valor si quieres que también venga de .env
-    )
-    user_repo.create(db, admin_user)
-    print("Usuario admin creado por defecto con credenciales:")
-    print(f"Usuario: {settings.initial_admin_username} / Contraseña: {settings.initial_admin_password}")
+    with get_session() as db:
+        user_repo = UserRepository()
+        role_repo = RoleRepository()
+
+        # Obtener el rol admin
+        admin_role = role_repo.get_by_name(db, "admin")
+        if not admin_role:
+            print("Rol 'admin' no encontrado. No se puede crear el usuario admin.")
+            return
+
+        # Verificar si ya existe el admin
+        existing_admin = user_repo.get_by_username(db, settings.initial_admin_username)
+        if existing_admin:
+            print(f"Usuario admin '{settings.initial_admin_username}' ya existe.")
+            return
+
+        # Crear usuario admin con datos desde .env
+        admin_user = User(
+            username=settings.initial_admin_username,
+            email=settings.initial_admin_email,
+            full_name=settings.initial_admin_full_name,
+            hashed_password=hash_password(settings.initial_admin_password),
+            enabled=True,
+            role_id=admin_role.id,
+            area="Administración"  # Puedes poner otro valor si quieres que también venga de .env
+        )
+        user_repo.create(db, admin_user)
+        print("Usuario admin creado por defecto con credenciales:")
+        print(f"Usuario: {settings.initial_admin_username} / Contraseña: {settings.initial_admin_password}")
+
+async def vigilar_sesiones():
+    # Una sesión que sigue abierta mucho después de su request retiene una conexión del pool
+    while True:
+        await asyncio.sleep(settings.db_revision_fugas_segundos)
+        revisar_fugas(settings.db_sesion_max_segundos)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -59,7 +71,21 @@ async def lifespan(app: FastAPI):
     SQLModel.metadata.create_all(engine)
     init_roles()
     init_admin_user()
+    if settings.modelos_precarga:
+        # Precarga en segundo plano: la API arranca sin esperar a los modelos
+        app.state.precarga_modelos = asyncio.create_task(asyncio.to_thread(iniciar_inferencia))
+    if settings.db_revision_fugas_segundos > 0:
+        app.state.vigilancia_sesiones = asyncio.create_task(vigilar_sesiones())
+    registro_accesos.iniciar()
+    if settings.correo_despacho_habilitado:
+        despachador_correos.iniciar()
     yield
+    await registro_accesos.detener()
+    await asyncio.to_thread(despachador_correos.detener)
+    if settings.db_revision_fugas_segundos > 0:
+        app.state.vigilancia_sesiones.cancel()
+    detener_inferencia()
+    await async_engine.dispose()
 
 
 
@@ -75,6 +101,8 @@ app.add_middleware(
     allow_credentials=True,     
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],        
     allow_headers=["*"],         
+    # Sin esto el navegador no deja leer el cursor ni el total de los listados paginados
+    expose_headers=[ENCABEZADO_CURSOR, ENCABEZADO_TOTAL],
 )
 
 
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# La configuración se lee al importar los módulos: el entorno de prueba va antes que cualquier import de la app
+_directorio = tempfile.mkdtemp(prefix="backend_clinico_pruebas_")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_directorio}/pruebas.db",
+    INITIAL_ADMIN_USERNAME="admin",
+    INITIAL_ADMIN_EMAIL="admin@pruebas.local",
+    INITIAL_ADMIN_FULL_NAME="Admin Pruebas",
+    INITIAL_ADMIN_PASSWORD="admin123",
+    SECRET_KEY="clave-de-pruebas",
+    ALGORITHM="HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES="30",
+    EMAIL_HOST="localhost",
+    EMAIL_PORT="1025",
+    EMAIL_HOST_USER="pruebas@pruebas.local",
+    EMAIL_HOST_PASSWORD="x",
+    EMAIL_USE_TLS="false",
+    # Sin modelos, sin SMTP ni vigilancia periódica: solo la API y la base de datos
+    MODELOS_PRECARGA="false",
+    CORREO_DESPACHO_HABILITADO="false",
+    DB_REVISION_FUGAS_SEGUNDOS="0",
+    PASSWORD_BCRYPT_RONDAS="4",
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    from fastapi.testclient import TestClient
+    import main
+
+    # Los errores del servidor llegan como 500 en la respuesta, así se pueden contar
+    with TestClient(main.app, raise_server_exceptions=False) as cliente:
+        yield cliente
+
+
+@pytest.fixture(scope="session")
+def token_admin(cliente) -> str:
+    respuesta = cliente.post("/api/v1/auth/login", json={"username": "admin", "password": "admin123"})
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["access_token"]
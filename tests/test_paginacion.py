@@ -0,0 +1,53 @@
+from backend_clinico.app.core.config import settings
+from backend_clinico.app.core.paginacion import ENCABEZADO_CURSOR, ENCABEZADO_TOTAL
+from backend_clinico.app.models.conection.conection import get_session
+from backend_clinico.security.domain.model.notification import Notification
+
+
+NOTIFICACIONES = 12
+
+
+def _crear_notificaciones():
+    with get_session() as db:
+        db.add_all([Notification(message=f"aviso {i}") for i in range(NOTIFICACIONES)])
+        db.commit()
+
+
+def test_listados_paginados_y_encabezados_visibles_por_cors(cliente, token_admin, monkeypatch):
+    _crear_notificaciones()
+    encabezados = {"Authorization": f"Bearer {token_admin}", "Origin": "http://localhost:3000"}
+
+    # Sin limite ni cursor: nunca la lista completa, sino la primera página con su cursor
+    monkeypatch.setattr(settings, "paginacion_limite_defecto", 0)
+    monkeypatch.setattr(settings, "paginacion_limite_maximo", 5)
+    respuesta = cliente.get("/api/v1/notifications/", headers=encabezados)
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()["notificaciones"]) == 5
+    assert ENCABEZADO_CURSOR in respuesta.headers
+    # Un limite mayor al máximo también se recorta
+    respuesta = cliente.get("/api/v1/notifications/", params={"limite": 50}, headers=encabezados)
+    assert len(respuesta.json()["notificaciones"]) == 5
+    monkeypatch.undo()
+
+    # Paginando: cada fila aparece una sola vez y el total coincide
+    vistos, cursor = [], None
+    while True:
+        parametros = {"limite": 5, "incluir_total": "true", **({"cursor": cursor} if cursor else {})}
+        respuesta = cliente.get("/api/v1/notifications/", params=parametros, headers=encabezados)
+        assert respuesta.status_code == 200
+        pagina = respuesta.json()["notificaciones"]
+        assert len(pagina) <= 5
+        vistos += [notificacion["id"] for notificacion in pagina]
+        expuestos = respuesta.headers["access-control-expose-headers"].lower()
+        assert ENCABEZADO_CURSOR.lower() in expuestos and ENCABEZADO_TOTAL.lower() in expuestos
+        cursor = respuesta.headers.get(ENCABEZADO_CURSOR)
+        if not cursor:
+            break
+
+    assert len(vistos) == len(set(vistos)) == int(respuesta.headers[ENCABEZADO_TOTAL])
+    assert vistos == sorted(vistos, reverse=True)
+
+
+def test_cursor_invalido(cliente, token_admin):
+    respuesta = cliente.get("/api/v1/notifications/", params={"cursor": "no-es-un-cursor"}, headers={"Authorization": f"Bearer {token_admin}"})
+    assert respuesta.status_code == 400
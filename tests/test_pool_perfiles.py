@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_clinico.app.models.conection.conection import engine, estadisticas_pool, get_session, sesiones_abiertas
+from backend_clinico.security.domain.model.profile import Profile
+from backend_clinico.security.domain.model.user import User
+from sqlmodel import select
+
+
+PETICIONES = 300
+CONCURRENCIA = 32
+
+
+def _perfil_del_admin() -> int:
+    with get_session() as db:
+        admin = db.exec(select(User).where(User.username == "admin")).one()
+        if not db.exec(select(Profile).where(Profile.user_id == admin.id)).first():
+            db.add(Profile(user_id=admin.id, full_name=admin.full_name, email=admin.email, area=admin.area))
+            db.commit()
+        return admin.id
+
+
+def test_perfiles_concurrentes_devuelven_las_conexiones_al_pool(cliente, token_admin):
+    user_id = _perfil_del_admin()
+    encabezados = {"Authorization": f"Bearer {token_admin}"}
+
+    def pedir(_):
+        return cliente.get(f"/api/v1/profiles/{user_id}", headers=encabezados).status_code
+
+    # Más peticiones que conexiones tiene el pool (tamaño + overflow): una sesión que no se
+    # cerrara dejaría su conexión tomada y las siguientes terminarían en timeout del pool (500)
+    capacidad = engine.pool.size() + engine.pool._max_overflow
+    assert PETICIONES > capacidad
+    with ThreadPoolExecutor(CONCURRENCIA) as hilos:
+        estados = list(hilos.map(pedir, range(PETICIONES)))
+
+    assert estados.count(200) == PETICIONES, {estado: estados.count(estado) for estado in set(estados)}
+    assert estadisticas_pool()["en_uso"] == 0
+    assert sesiones_abiertas() == []